@@ -0,0 +1,100 @@
+# core/cache.py
+import hashlib
+import marshal
+import os
+import zlib
+from collections import OrderedDict
+
+
+class ScheduleCache:
+    """
+    Content-addressed store for scheduling results (CPULogic.cached).
+     - memory tier: LRU, sized by each entry's serialized (marshal) length
+       and evicted oldest first until the total fits `max_bytes`
+     - disk tier  : optional; one zlib-compressed marshal file per key in
+       `directory`, checked after a memory miss and promoted on a hit
+    Keys are hashes of the workload and the run's parameters, so an entry
+    never goes stale: a changed workload simply asks for another key.
+    """
+
+    MAGIC = b"SCH" + bytes([marshal.version])
+
+    def __init__(self, max_bytes=64 << 20, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.entries = OrderedDict()    # key -> (value, size)
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(*parts):
+        h = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            if isinstance(part, dict):
+                part = sorted(part.items())
+            h.update(repr(part).encode())
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        blob = self._read(key)
+        if blob is not None:
+            raw = zlib.decompress(blob)
+            value = marshal.loads(raw)
+            self._remember(key, value, len(raw))
+            self.hits += 1
+            return value
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        raw = marshal.dumps(value)
+        self._remember(key, value, len(raw))
+        if self.directory:
+            blob = zlib.compress(raw, 1)
+            path = self._path(key)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(self.MAGIC)
+                f.write(blob)
+            os.replace(tmp, path)
+
+    def clear(self):
+        """Drop the memory tier; files on disk are left alone."""
+        self.entries.clear()
+        self.size = 0
+
+    def _remember(self, key, value, size):
+        if size > self.max_bytes:
+            return
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.size -= old[1]
+        self.entries[key] = (value, size)
+        self.size += size
+        while self.size > self.max_bytes:
+            _, (_, dropped) = self.entries.popitem(last=False)
+            self.size -= dropped
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".sched")
+
+    def _read(self, key):
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if not data.startswith(self.MAGIC):
+            return None
+        return data[len(self.MAGIC):]
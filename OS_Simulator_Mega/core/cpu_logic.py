@@ -1,131 +1,1875 @@
+import hashlib
+import heapq
+import itertools
+import math
+import os
+import random
+from array import array
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+from multiprocessing import shared_memory
+from operator import itemgetter, ne
+
+
+class ProcessTable:
+    """Column store for the process set.
+
+    arrival, burst and priority are typed arrays ("q" while every value is
+    an integer, widened to "d" once a float shows up); pid stays an array
+    of ints unless a non-integer pid is added.  The schedulers index the
+    columns directly, so a million-process workload costs a few flat
+    buffers instead of a million dicts.
+    """
+
+    FIELDS = ("pid", "arrival", "burst", "priority")
+
+    def __init__(self):
+        self._sorted = None
+        self._digest = None
+        self.clear()
+
+    def clear(self):
+        self.pid = array("q")
+        self.arrival = array("q")
+        self.burst = array("q")
+        self.priority = array("q")
+        self.version = getattr(self, "version", -1) + 1
+
+    def __len__(self):
+        return len(self.arrival)
+
+    def __getitem__(self, i):
+        return {f: getattr(self, f)[i] for f in self.FIELDS}
+
+    def __iter__(self):
+        return map(self.__getitem__, range(len(self)))
+
+    def by_arrival(self):
+        """(indices in arrival order, their arrival times), stable on ties:
+        an array("q") and an array in the arrival column's typecode. Cached
+        until the table changes, so repeated runs sort only once."""
+        if self._sorted is None or self._sorted[0] != self.version:
+            arrival = self.arrival
+            order = array("q", sorted(range(len(arrival)), key=arrival.__getitem__))
+            self._sorted = (self.version, order, _gather(arrival, order))
+        return self._sorted[1:]
+
+    def digest(self):
+        """Hex hash of the table's contents (column types included, since an
+        int and a float workload give differently typed results). Cached
+        until the table changes."""
+        if self._digest is None or self._digest[0] != self.version:
+            h = hashlib.blake2b(digest_size=16)
+            h.update(len(self).to_bytes(8, "little"))
+            for f in self.FIELDS:
+                col = getattr(self, f)
+                if isinstance(col, array):
+                    h.update(col.typecode.encode())
+                    h.update(col)
+                else:
+                    h.update(repr(col).encode())
+            self._digest = (self.version, h.hexdigest())
+        return self._digest[1]
+
+    def append(self, pid, arrival, burst, priority=0):
+        self.extend((pid,), (arrival,), (burst,), (priority,))
+
+    def extend(self, pids, arrivals, bursts, priorities=None):
+        n = len(arrivals)
+        if priorities is None:
+            priorities = array("q", bytes(8 * n))
+        if pids is None:
+            pids = range(len(self) + 1, len(self) + n + 1)
+        if not len(pids) == len(bursts) == len(priorities) == n:
+            raise ValueError("process columns must have equal length")
+        # Convert every column before touching any of them so a bad value
+        # cannot leave the table ragged.
+        staged = [(f, self._column(getattr(self, f), col))
+                  for f, col in zip(self.FIELDS, (pids, arrivals, bursts, priorities))]
+        for f, col in staged:
+            old = getattr(self, f)
+            if isinstance(col, list) and not isinstance(old, list):
+                old = list(old)
+            elif isinstance(col, array) and col.typecode != getattr(old, "typecode", col.typecode):
+                old = array("d", old)
+            old.extend(col)
+            setattr(self, f, old)
+        self.version += 1
+
+    @staticmethod
+    def _column(old, values):
+        code = getattr(old, "typecode", None)
+        if isinstance(values, array) and values.typecode in ("q", "d"):
+            if code == "d" and values.typecode == "q":
+                return array("d", values)
+            return values
+        if code is None:
+            return list(values)
+        try:
+            return array(code, values)
+        except TypeError:
+            pass
+        try:
+            return array("d", values)
+        except TypeError:
+            return list(values)
+
+
 class CPULogic:
     def __init__(self):
-        self.processes = []
+        self.processes = ProcessTable()
+        self.tasks = []
+        self.cache = None           # optional core.cache.ScheduleCache
+
+    @classmethod
+    def from_arrays(cls, arrivals, bursts, priorities=None, pids=None):
+        logic = cls()
+        logic.add_processes(arrivals, bursts, priorities, pids)
+        return logic
 
     def add_process(self, pid, arrival, burst, priority=0):
-        self.processes.append({
-            "pid": pid,
-            "arrival": arrival,
-            "burst": burst,
-            "priority": priority
-        })
+        self.processes.append(pid, arrival, burst, priority)
+
+    def add_processes(self, arrivals, bursts, priorities=None, pids=None):
+        # Bulk load; pids default to 1..n continuing from the table size.
+        self.processes.extend(pids, arrivals, bursts, priorities)
+
+    # ---------- CACHED RUNS ----------
+    def cached(self, algo, **params):
+        """
+        getattr(self, algo)(**params) through self.cache when one is set.
+        The key covers the process table digest, the periodic tasks, the
+        algorithm and its parameters, so adding or clearing processes moves
+        to a fresh key by itself. Cached results are shared: read-only.
+        """
+        if params.get("stream"):
+            raise ValueError("streamed runs cannot be cached")
+        if self.cache is None:
+            return getattr(self, algo)(**params)
+        key = self.cache.key(self.processes.digest(), repr(self.tasks), algo, params)
+        value = self.cache.get(key)
+        if value is None:
+            value = getattr(self, algo)(**params)
+            self.cache.put(key, value)
+        return value
 
     # ---------- FCFS ----------
-    def fcfs(self):
-        procs = sorted(self.processes, key=lambda x: x["arrival"])
+    def fcfs(self, stream=False):
+        events = self.fcfs_stream()
+        return events if stream else _collect(events)
+
+    # ---------- INCREMENTAL (FCFS / SJF / Priority) ----------
+    def incremental(self, policy="fcfs"):
+        """IncrementalSchedule seeded with the current processes."""
+        inc = IncrementalSchedule(policy)
+        procs = self.processes
+        for row in zip(procs.pid, procs.arrival, procs.burst, procs.priority):
+            inc.add(*row, replay=False)
+        inc.rebuild()
+        return inc
+
+    # ---------- NON-PREEMPTIVE EVENT CORE (shared by SJF / Priority) ----------
+    def _nonpreemptive(self, key):
+        # Ready processes live in a min-heap keyed by (key, insertion index), so
+        # ties resolve in the order processes were added. When nothing is ready
+        # the clock jumps straight to the next arrival instead of ticking.
+        procs = self.processes
+        arrival, burst, pids = procs.arrival, procs.burst, procs.pid
+        keys = getattr(procs, key)
+        order, arrivals = procs.by_arrival()
+        n = len(order)
         time = 0
-        gantt = []
-        result = []
+        ready = []
+        i = 0
+
+        while i < n or ready:
+            if not ready and arrival[order[i]] > time:
+                time = arrival[order[i]]
 
-        for p in procs:
-            if time < p["arrival"]:
-                time = p["arrival"]
+            while i < n and arrival[order[i]] <= time:
+                j = order[i]
+                heapq.heappush(ready, (keys[j], j))
+                i += 1
+
+            j = heapq.heappop(ready)[1]
 
             start = time
-            end = time + p["burst"]
-            gantt.append((p["pid"], start, end))
+            end = _snap(time + burst[j], arrivals, i)
+            yield pids[j], start, end
 
-            wt = start - p["arrival"]
-            tat = end - p["arrival"]
-            result.append({"pid": p["pid"], "wt": wt, "tat": tat})
+            wt = start - arrival[j]
+            tat = end - arrival[j]
+            yield {"pid": pids[j], "wt": wt, "tat": tat}
 
             time = end
 
-        return gantt, result
-
     # ---------- SJF (Non-preemptive) ----------
-    def sjf(self):
+    def sjf(self, stream=False):
+        events = self._nonpreemptive("burst")
+        return events if stream else _collect(events)
+
+    # ---------- PRIORITY (Non-preemptive, lower value = higher priority) ----------
+    def priority(self, stream=False):
+        events = self._nonpreemptive("priority")
+        return events if stream else _collect(events)
+
+    # ---------- PREEMPTIVE EVENT CORE (shared by SRTF / Preemptive Priority) ----------
+    def _preemptive(self, key):
+        # The CPU is only re-examined at arrival and completion events. For
+        # key="burst" the heap is keyed by remaining time (SRTF); a newcomer
+        # preempts only if its key is strictly smaller than the running one's.
+        procs = self.processes
+        arrival, pids = procs.arrival, procs.pid
+        order, arrivals = procs.by_arrival()
+        n = len(order)
+        remaining = list(procs.burst)
+        keys = remaining if key == "burst" else getattr(procs, key)
+        by_finish = key == "burst"
+        first_run = [None] * len(procs)
         time = 0
-        gantt = []
-        result = []
-        procs = self.processes.copy()
+        ready = []
+        cur = None
+        seg_start = 0
+        i = 0
 
-        while procs:
-            available = [p for p in procs if p["arrival"] <= time]
-            if not available:
-                time += 1
-                continue
+        while i < n or ready or cur is not None:
+            if cur is None:
+                if not ready and arrivals[i] > time:
+                    time = arrivals[i]
+                while i < n and arrivals[i] <= time:
+                    j = order[i]
+                    heapq.heappush(ready, (keys[j], j))
+                    i += 1
+                cur = heapq.heappop(ready)[1]
+                seg_start = time
+                if first_run[cur] is None:
+                    first_run[cur] = time
+                # SRTF compares finishing instants: remaining + now against the
+                # running process's planned end
+                run_key = time + remaining[cur] if by_finish else keys[cur]
+
+            finish = _snap(seg_start + remaining[cur], arrivals, i)
+            if i < n and arrivals[i] < finish:
+                time = arrivals[i]
+                while i < n and arrivals[i] <= time:
+                    j = order[i]
+                    heapq.heappush(ready, (keys[j], j))
+                    i += 1
+                top = ready[0][0] + time if by_finish else ready[0][0]
+                if top < run_key and not _residue(run_key - top, time):
+                    yield pids[cur], seg_start, time
+                    remaining[cur] -= time - seg_start
+                    heapq.heappush(ready, (keys[cur], cur))
+                    cur = None
+            else:
+                remaining[cur] = 0
+                time = finish
+                yield pids[cur], seg_start, time
 
-            p = min(available, key=lambda x: x["burst"])
-            procs.remove(p)
+                tat = time - arrival[cur]
+                wt = tat - procs.burst[cur]
+                rt = first_run[cur] - arrival[cur]
+                yield {"pid": pids[cur], "wt": wt, "tat": tat, "rt": rt}
+                cur = None
 
-            start = time
-            end = time + p["burst"]
-            gantt.append((p["pid"], start, end))
+    # ---------- SRTF (Preemptive SJF) ----------
+    def srtf(self, stream=False):
+        events = self._preemptive("burst")
+        return events if stream else _collect(events)
+
+    # ---------- PRIORITY (Preemptive, lower value = higher priority) ----------
+    def priority_preemptive(self, stream=False):
+        events = self._preemptive("priority")
+        return events if stream else _collect(events)
+
+    # ---------- ROUND ROBIN ----------
+    def round_robin(self, quantum, merge=False, stream=False):
+        # With merge=True, back-to-back slices of the same PID become a single
+        # Gantt segment; otherwise every slice is its own segment.
+        events = self._round_robin(quantum, split=not merge)
+        if merge:
+            events = _merged(events)
+        return events if stream else _collect(events)
+
+    def _round_robin(self, quantum, split):
+        # Deque-based ready queue; an idle CPU jumps to the next arrival. When a
+        # process is alone it keeps the CPU until its slice crosses the next
+        # arrival, so those slices are produced in one step.
+        procs = self.processes
+        arrival = procs.arrival
+        order, arrivals = procs.by_arrival()
+        n = len(order)
+        pids = procs.pid
+        remaining = list(procs.burst)
+        time = 0
+        queue = deque()
+        i = 0
 
-            wt = start - p["arrival"]
-            tat = end - p["arrival"]
-            result.append({"pid": p["pid"], "wt": wt, "tat": tat})
+        while i < n or queue:
+            if not queue and arrivals[i] > time:
+                time = arrivals[i]
 
+            while i < n and arrivals[i] <= time:
+                queue.append(order[i])
+                i += 1
+
+            j = queue.popleft()
+            pid = pids[j]
+            left = remaining[j]
+
+            if queue:
+                run = quantum if left > quantum else left
+            elif i < n:
+                # alone: the first slice ending at/after the next arrival lets it in
+                slices = max(1, _slices(arrivals[i] - time, quantum))
+                run = min(slices * quantum, left)
+            else:
+                run = left
+
+            start = time
+            end = _snap(time + run, arrivals, i)
+            if split and run > quantum:
+                for k in range(int(_slices(run, quantum))):
+                    s = start + k * quantum
+                    yield pid, s, min(s + quantum, end)
+            else:
+                yield pid, start, end
+
+            remaining[j] = 0 if _residue(left - run, end) else left - run
             time = end
 
-        return gantt, result
+            while i < n and arrivals[i] <= time:
+                queue.append(order[i])
+                i += 1
 
-    # ---------- PRIORITY (Non-preemptive, lower value = higher priority) ----------
-    def priority(self):
+            if remaining[j] > 0:
+                queue.append(j)
+            else:
+                tat = time - arrival[j]
+                wt = tat - procs.burst[j]
+                yield {"pid": pid, "wt": wt, "tat": tat}
+
+
+    # ---------- STREAMING FCFS / ROUND ROBIN ----------
+    # These consume (pid, arrival, burst, priority) tuples in arrival order,
+    # e.g. Workload.stream(), and yield (pid, start, end) segments and
+    # {"pid", "wt", "tat"} completion records as they happen. Only the ready
+    # queue is held, so the input can be far larger than memory.
+    def _source(self, source):
+        if source is None:
+            procs = self.processes
+            order = procs.by_arrival()[0]
+            columns = (procs.pid, procs.arrival, procs.burst, procs.priority)
+            source = zip(*(map(col.__getitem__, order) for col in columns))
+        last = None
+        for item in source:
+            if last is not None and item[1] < last:
+                raise ValueError("stream must be sorted by arrival")
+            last = item[1]
+            yield item
+
+    def fcfs_stream(self, source=None):
         time = 0
-        gantt = []
-        result = []
-        procs = self.processes.copy()
+        for pid, arrival, burst, _ in self._source(source):
+            if time < arrival:
+                time = arrival
+            start = time
+            time += burst
+            yield pid, start, time
+            yield {"pid": pid, "wt": start - arrival, "tat": time - arrival}
 
-        while procs:
-            available = [p for p in procs if p["arrival"] <= time]
-            if not available:
-                time += 1
-                continue
+    def round_robin_stream(self, quantum, source=None):
+        # Same rules as round_robin(merge=True): a process alone keeps the CPU
+        # until its slice crosses the next arrival.
+        source = self._source(source)
+        nxt = next(source, None)
+        queue = deque()             # [pid, arrival, burst, remaining]
+        time = 0
 
-            p = min(available, key=lambda x: x["priority"])
-            procs.remove(p)
+        while nxt is not None or queue:
+            if not queue and nxt[1] > time:
+                time = nxt[1]
+            while nxt is not None and nxt[1] <= time:
+                queue.append([nxt[0], nxt[1], nxt[2], nxt[2]])
+                nxt = next(source, None)
+
+            p = queue.popleft()
+            left = p[3]
+            if queue:
+                run = quantum if left > quantum else left
+            elif nxt is not None:
+                slices = max(1, _slices(nxt[1] - time, quantum))
+                run = min(slices * quantum, left)
+            else:
+                run = left
 
             start = time
-            end = time + p["burst"]
-            gantt.append((p["pid"], start, end))
+            time += run
+            p[3] = left - run
+            yield p[0], start, time
+
+            while nxt is not None and nxt[1] <= time:
+                queue.append([nxt[0], nxt[1], nxt[2], nxt[2]])
+                nxt = next(source, None)
+
+            if p[3] > 0:
+                queue.append(p)
+            else:
+                tat = time - p[1]
+                yield {"pid": p[0], "wt": tat - p[2], "tat": tat}
+
+    # ---------- LOTTERY / STRIDE (proportional share) ----------
+    # Both use the priority field as tickets (values below 1 count as 1) and
+    # hand out the CPU one quantum at a time; a process alone keeps it until
+    # the first slice end at/after the next arrival, as in round_robin().
+    def lottery(self, quantum=1, seed=None, stream=False):
+        """Each quantum goes to a ticket drawn uniformly at random (seeded);
+        a Fenwick tree over the tickets of ready processes makes every draw,
+        arrival and completion O(log n)."""
+        events = _merged(self._proportional(quantum, random.Random(seed)))
+        return events if stream else _collect(events)
+
+    def stride(self, quantum=1, stream=False):
+        """Deterministic counterpart of lottery(): run the ready process with
+        the smallest pass, then advance its pass by STRIDE1 / tickets per
+        quantum. Newcomers start at the current minimum pass."""
+        events = _merged(self._proportional(quantum, None))
+        return events if stream else _collect(events)
+
+    def _proportional(self, quantum, rng):
+        if quantum <= 0:
+            raise ValueError("quantum must be positive")
+        procs = self.processes
+        arrival = procs.arrival
+        order, arrivals = procs.by_arrival()
+        n = len(order)
+        pids = procs.pid
+        remaining = list(procs.burst)
+        tickets = [int(t) if t >= 1 else 1 for t in procs.priority]
+        first_run = [None] * len(procs)
+
+        if rng is not None:
+            pool = _Fenwick(len(procs))
+        else:
+            pool = []               # (pass, seq, index)
+            passes = [0.0] * len(procs)
+            seq = 0
+            floor = 0.0             # pass given to newcomers
+        count = 0
+        time = 0
+        i = 0
 
-            wt = start - p["arrival"]
-            tat = end - p["arrival"]
-            result.append({"pid": p["pid"], "wt": wt, "tat": tat})
+        while i < n or count:
+            if not count and arrivals[i] > time:
+                time = arrivals[i]
+            while i < n and arrivals[i] <= time:
+                j = order[i]
+                if rng is not None:
+                    pool.add(j, tickets[j])
+                else:
+                    passes[j] = floor
+                    heapq.heappush(pool, (floor, seq, j))
+                    seq += 1
+                count += 1
+                i += 1
 
+            if rng is not None:
+                j = pool.find(rng.randrange(pool.total) if count > 1 else 0)
+            else:
+                floor, _, j = heapq.heappop(pool)
+            if first_run[j] is None:
+                first_run[j] = time
+
+            left = remaining[j]
+            if count > 1:
+                run = quantum if left > quantum else left
+            elif i < n:
+                run = min(left, max(1, _slices(arrivals[i] - time, quantum)) * quantum)
+            else:
+                run = left
+            end = _snap(time + run, arrivals, i)
+            yield pids[j], time, end
             time = end
+            remaining[j] = 0 if run >= left or _residue(left - run, end) else left - run
 
-        return gantt, result
+            if remaining[j]:
+                if rng is None:
+                    passes[j] += run * (STRIDE1 / tickets[j]) / quantum
+                    heapq.heappush(pool, (passes[j], seq, j))
+                    seq += 1
+                continue
+            count -= 1
+            if rng is not None:
+                pool.add(j, -tickets[j])
+            tat = time - arrival[j]
+            yield {"pid": pids[j], "wt": tat - procs.burst[j], "tat": tat, "rt": first_run[j] - arrival[j]}
+
+    # ---------- MLFQ (Multilevel Feedback Queue) ----------
+    def mlfq(self, levels=3, quantum=2, boost=None, stream=False):
+        """
+        Multilevel feedback queue with `levels` round-robin levels.
+         - quantum: number (doubled on every lower level) or one value per level
+         - boost  : period after which every process returns to the top level;
+                    the running process keeps its slice and is lifted on requeue
+        New arrivals enter level 0 and preempt lower levels; a process that uses
+        its whole quantum is demoted. Gantt segments are maximal runs of a PID.
+        """
+        if isinstance(quantum, (int, float)):
+            quanta = [quantum * 2 ** k for k in range(levels)]
+        else:
+            quanta = list(quantum)
+            if len(quanta) != levels:
+                raise ValueError("need one quantum per level")
+        events = _merged(self._mlfq(quanta, boost))
+        return events if stream else _collect(events)
+
+    def _mlfq(self, quanta, boost):
+        procs = self.processes
+        arrival = procs.arrival
+        order, arrivals = procs.by_arrival()
+        n = len(order)
+        pids = procs.pid
+        remaining = list(procs.burst)
+        level = [0] * len(procs)
+        slice_left = [quanta[0]] * len(procs)
+        first_run = [None] * len(procs)
+        bottom = len(quanta) - 1
+
+        # Level 0 is a chain of deques: a boost appends the lower deques to it
+        # (O(levels)) and stale per-process levels are reset when popped.
+        ready = _FeedbackQueue(len(quanta))
+        next_boost = boost if boost else None
 
-    # ---------- ROUND ROBIN ----------
-    def round_robin(self, quantum):
         time = 0
-        gantt = []
-        result = {}
-        queue = []
-        procs = sorted(self.processes, key=lambda x: x["arrival"])
-        remaining = {p["pid"]: p["burst"] for p in procs}
-        arrived = []
-
-        while procs or queue:
-            while procs and procs[0]["arrival"] <= time:
-                queue.append(procs.pop(0))
-
-            if not queue:
-                time += 1
+        i = 0
+
+        while i < n or ready:
+            if not ready and arrivals[i] > time:
+                time = arrivals[i]
+            while i < n and arrivals[i] <= time:
+                ready.push(0, order[i])
+                i += 1
+            if next_boost is not None and time >= next_boost:
+                ready.boost()
+                next_boost = (time // boost + 1) * boost
+
+            # ---- pick the head of the highest non-empty level ----
+            lvl, j = ready.pop()
+            if lvl == 0 and level[j]:
+                level[j] = 0
+                slice_left[j] = quanta[0]
+            lvl = level[j]
+            if first_run[j] is None:
+                first_run[j] = time
+
+            # ---- run until the next event: slice end, completion, arrival ----
+            left = remaining[j]
+            sl = slice_left[j]
+            alone = lvl == bottom and not ready
+            if alone:
+                run = left
+                if lvl == 0 and i < n:
+                    # single level: the first slice end at/after the next arrival
+                    extra = max(0, arrivals[i] - time - sl)
+                    run = min(run, sl + _slices(extra, quanta[0]) * quanta[0])
+            else:
+                run = min(left, sl)
+            stop = _snap(time + run, arrivals, i)
+            if lvl and i < n and arrivals[i] < stop:
+                stop = arrivals[i]
+                run = stop - time
+            pid = pids[j]
+            yield pid, time, stop
+            # compare against the completion and slice-end instants, not stop - time,
+            # so float arrivals cannot leave a rounding residue behind
+            remaining[j] = 0 if stop >= time + left or _residue(left - run, stop) else left - run
+            expired = stop >= time + sl or _residue(sl - run, stop)
+            time = stop
+
+            while i < n and arrivals[i] <= time:
+                ready.push(0, order[i])
+                i += 1
+
+            if remaining[j] == 0:
+                tat = time - arrival[j]
+                wt = tat - procs.burst[j]
+                rt = first_run[j] - arrival[j]
+                yield {"pid": pid, "wt": wt, "tat": tat, "rt": rt}
                 continue
 
-            p = queue.pop(0)
-            pid = p["pid"]
-            exec_time = min(quantum, remaining[pid])
+            # A boost that fell inside the slice does not cut it short: the lower
+            # queues are lifted at the top of the loop and the running process
+            # goes back to level 0 instead of being demoted.
+            if alone:
+                q = quanta[lvl]
+                rest = sl - run if run < sl else q - (run - sl) % q
+                slice_left[j] = q if _residue(rest, time) else rest
+                ready.push(lvl, j, front=lvl > 0)
+            elif expired:
+                if next_boost is not None and time >= next_boost:
+                    lvl = level[j] = 0
+                elif lvl < bottom:
+                    lvl += 1
+                    level[j] = lvl
+                slice_left[j] = quanta[lvl]
+                ready.push(lvl, j)
+            else:
+                # preempted by a new arrival: resume first on its level
+                slice_left[j] = sl - run
+                ready.push(lvl, j, front=True)
 
-            start = time
-            end = time + exec_time
-            gantt.append((pid, start, end))
+    # ---------- CFS (Completely Fair Scheduler) ----------
+    def cfs(self, target_latency=6, min_granularity=1, stream=False):
+        """
+        Linux-style CFS: always run the task with the smallest virtual runtime.
+         - priority is the nice value (-20..19), mapped onto the kernel weights
+         - target_latency : period in which every runnable task runs once
+         - min_granularity: shortest slice, the period stretches past it
+        A task's slice is its weight's share of the period; vruntime grows by
+        run * 1024 / weight. New arrivals start at the current min vruntime.
+        """
+        if not 0 < min_granularity <= target_latency:
+            raise ValueError("need 0 < min_granularity <= target_latency")
+        events = _merged(self._cfs(target_latency, min_granularity))
+        return events if stream else _collect(events)
+
+    def _cfs(self, target_latency, min_granularity):
+        procs = self.processes
+        arrival = procs.arrival
+        order, arrivals = procs.by_arrival()
+        n = len(order)
+        pids = procs.pid
+        remaining = list(procs.burst)
+        weight = [NICE_TO_WEIGHT[min(max(nice, -20), 19) + 20] for nice in procs.priority]
+        vruntime = [0.0] * len(procs)
+        first_run = [None] * len(procs)
+        nr_latency = max(1, target_latency // min_granularity)
+
+        time = 0
+        ready = []          # (vruntime, seq, index): seq keeps FIFO order on ties
+        seq = 0
+        min_vruntime = 0.0
+        load = 0            # total weight of the ready tasks plus the running one
+        i = 0
 
-            remaining[pid] -= exec_time
+        while i < n or ready:
+            if not ready and arrivals[i] > time:
+                time = arrivals[i]
+            while i < n and arrivals[i] <= time:
+                j = order[i]
+                vruntime[j] = min_vruntime
+                heapq.heappush(ready, (min_vruntime, seq, j))
+                seq += 1
+                load += weight[j]
+                i += 1
+
+            v, _, j = heapq.heappop(ready)
+            if first_run[j] is None:
+                first_run[j] = time
+            nr = len(ready) + 1
+            period = target_latency if nr <= nr_latency else nr * min_granularity
+            slice_ = max(min_granularity, period * weight[j] // load)
+
+            left = remaining[j]
+            if not ready:
+                # alone: keep the CPU until the first slice end past the next arrival
+                run = left
+                if i < n:
+                    gap = arrivals[i] - time
+                    run = min(left, max(1, _slices(gap, slice_)) * slice_)
+            else:
+                run = min(left, slice_)
+
+            # arrivals during the slice are placed at the min vruntime of that instant
+            scale = NICE_0_WEIGHT / weight[j]
+            end = _snap(time + run, arrivals, i)
+            while i < n and arrivals[i] < end:
+                k = order[i]
+                cur_v = v + (arrivals[i] - time) * scale
+                min_vruntime = max(min_vruntime, min(cur_v, ready[0][0]) if ready else cur_v)
+                vruntime[k] = min_vruntime
+                heapq.heappush(ready, (min_vruntime, seq, k))
+                seq += 1
+                load += weight[k]
+                i += 1
+
+            pid = pids[j]
+            yield pid, time, end
             time = end
+            v += run * scale
+            vruntime[j] = v
+            remaining[j] = 0 if _residue(left - run, end) else left - run
 
-            while procs and procs[0]["arrival"] <= time:
-                queue.append(procs.pop(0))
+            if remaining[j] > 0:
+                heapq.heappush(ready, (v, seq, j))
+                seq += 1
+            else:
+                load -= weight[j]
+                tat = time - arrival[j]
+                wt = tat - procs.burst[j]
+                rt = first_run[j] - arrival[j]
+                yield {"pid": pid, "wt": wt, "tat": tat, "rt": rt}
+            if ready:
+                min_vruntime = max(min_vruntime, ready[0][0])
 
-            if remaining[pid] > 0:
-                queue.append(p)
+    # ---------- SMP (N identical cores) ----------
+    def smp(self, algo="fcfs", cores=2, queues="global", balance="steal",
+            migration_cost=0, balance_interval=10, stream=False, **params):
+        """
+        Run one of the single-core algorithms on `cores` identical CPUs.
+         - algo          : fcfs, sjf, priority, srtf, priority_preemptive,
+                           round_robin, mlfq or cfs
+         - queues        : "global" (one shared run queue) or "per-core"
+         - balance       : per-core only; "steal" lets an idle core pull from the
+                           longest queue, "periodic" evens the queues out every
+                           balance_interval, None never moves queued work
+         - migration_cost: dead time charged when a process resumes on a
+                           different core than the one it last ran on
+         - params        : the algorithm's own arguments (quantum, levels, ...)
+        New arrivals go to an idle core when there is one, otherwise to the
+        per-core queues in turn. Returns (lanes, result) with one merged Gantt
+        list per core; with cores=1 every algorithm matches its single-core method.
+        With stream=True the segments come as (pid, start, end, core).
+        """
+        if cores < 1:
+            raise ValueError("need at least one core")
+        if queues not in ("global", "per-core"):
+            raise ValueError("queues must be 'global' or 'per-core'")
+        if algo not in SMP_ALGORITHMS:
+            raise ValueError(f"unknown algorithm: {algo}")
+        events = self._smp(algo, cores, queues, balance, migration_cost, balance_interval, params)
+        return events if stream else _collect_lanes(events, cores)
+
+    def _smp(self, algo, cores, queues, balance, migration_cost, balance_interval, params):
+        procs = self.processes
+        arrival = procs.arrival
+        order, arrivals = procs.by_arrival()
+        n = len(order)
+        pids = procs.pid
+        remaining = list(procs.burst)
+        first_run = [None] * len(procs)
+        last_core = [-1] * len(procs)
+
+        per_core = queues == "per-core"
+        nq = cores if per_core else 1
+        core_q = list(range(cores)) if per_core else [0] * cores
+        steal = per_core and balance == "steal"
+        next_balance = balance_interval if per_core and balance == "periodic" else None
+        lengths = _QueueLengths(nq) if per_core and balance in ("steal", "periodic") else None
+        fifo = itertools.count()                # tie-breaker for FIFO policies
+        mlfq = algo == "mlfq"
+        cfs = algo == "cfs"
+
+        # ---- policy: initial key, slice length and the key on requeue ----
+        preemptive = algo in ("srtf", "priority_preemptive", "mlfq")
+        by_finish = algo == "srtf"
+        sliced = algo in ("round_robin", "mlfq", "cfs")
+        next_boost = None
+        if algo in ("sjf", "priority", "srtf", "priority_preemptive"):
+            field = "priority" if "priority" in algo else "burst"
+            static = getattr(procs, field)
+        elif algo == "round_robin":
+            quantum = params.get("quantum", 2)
+        elif mlfq:
+            levels = params.get("levels", 3)
+            quantum = params.get("quantum", 2)
+            if isinstance(quantum, (int, float)):
+                quanta = [quantum * 2 ** k for k in range(levels)]
+            else:
+                quanta = list(quantum)
+                if len(quanta) != levels:
+                    raise ValueError("need one quantum per level")
+            bottom = levels - 1
+            boost = params.get("boost")
+            next_boost = boost if boost else None
+            level = [0] * len(procs)
+            slice_left = [quanta[0]] * len(procs)
+        elif cfs:
+            target_latency = params.get("target_latency", 6)
+            min_granularity = params.get("min_granularity", 1)
+            if not 0 < min_granularity <= target_latency:
+                raise ValueError("need 0 < min_granularity <= target_latency")
+            nr_latency = max(1, target_latency // min_granularity)
+            weight = [NICE_TO_WEIGHT[min(max(nice, -20), 19) + 20] for nice in procs.priority]
+            vruntime = [0.0] * len(procs)
+            qmin = [0.0] * nq
+            qload = [0] * nq
+
+        # MLFQ queues are deque chains (O(levels) boost); the rest are heaps of
+        # (key, tie, index)
+        qs = [_FeedbackQueue(levels) if mlfq else [] for _ in range(nq)]
+
+        def qpush(q, entry):
+            if mlfq:
+                qs[q].push(entry[0], entry[2], entry[1] < 0)
+            else:
+                heapq.heappush(qs[q], entry)
+            if lengths:
+                lengths.grow(q)
+
+        def qpop(q):
+            if mlfq:
+                lvl, j = qs[q].pop()
+                entry = (lvl, 0, j)
+            else:
+                entry = heapq.heappop(qs[q])
+            if lengths:
+                lengths.shrink(q)
+            return entry
+
+        def qtop(q):
+            return qs[q].top_level() if mlfq else qs[q][0][0]
+
+        def enqueue(j, q, t):
+            if algo == "fcfs" or algo == "round_robin" or mlfq:
+                entry = (0, next(fifo), j)
+            elif algo == "srtf":
+                entry = (remaining[j], j, j)
+            elif cfs:
+                # place at the queue's min vruntime, which follows the running task
+                cores_of_q = (q,) if per_core else range(cores)
+                cur = [vruntime[k] + elapsed(c, t) * (NICE_0_WEIGHT / weight[k])
+                       for c in cores_of_q for k in (running[c],) if k >= 0]
+                if cur:
+                    v = min(cur)
+                    if qs[q] and qs[q][0][0] < v:
+                        v = qs[q][0][0]
+                    if v > qmin[q]:
+                        qmin[q] = v
+                vruntime[j] = qmin[q]
+                qload[q] += weight[j]
+                entry = (qmin[q], next(fifo), j)
             else:
-                tat = time - p["arrival"]
-                wt = tat - p["burst"]
-                result[pid] = {"pid": pid, "wt": wt, "tat": tat}
+                entry = (static[j], j, j)
+            qpush(q, entry)
+
+        def requeue(j, q, ran, expired, c, t, tie=None):
+            if algo == "round_robin":
+                entry = (0, next(fifo), j)
+            elif algo == "srtf":
+                entry = (remaining[j], j, j)
+            elif mlfq:
+                # same rules as mlfq(); a boost inside a full slice lifts to level 0
+                lvl = level[j]
+                sl = run_slice[c]
+                if run_alone[c]:
+                    qq = quanta[lvl]
+                    rest = sl - ran if ran < sl else qq - (ran - sl) % qq
+                    slice_left[j] = qq if _residue(rest, t) else rest
+                    entry = (lvl, next(fifo) if lvl == 0 else -next(fifo), j)
+                elif expired or _residue(sl - ran, t):
+                    if next_boost is not None and t >= (start[c] // boost + 1) * boost:
+                        lvl = 0
+                    elif lvl < bottom:
+                        lvl += 1
+                    level[j] = lvl
+                    slice_left[j] = quanta[lvl]
+                    entry = (lvl, next(fifo), j)
+                else:
+                    # preempted: resume first on its level
+                    slice_left[j] = sl - ran
+                    entry = (lvl, -next(fifo), j)
+            elif cfs:
+                vruntime[j] += ran * (NICE_0_WEIGHT / weight[j])
+                entry = (vruntime[j], next(fifo) if tie is None else tie, j)
+            else:
+                entry = (static[j], j, j)
+            qpush(q, entry)
+
+        def slice_of(j, q):
+            if algo == "round_robin":
+                return quantum
+            if mlfq:
+                return slice_left[j]
+            if cfs:
+                nr = len(qs[q]) + 1 if per_core else len(qs[q]) // cores + 1
+                period = target_latency if nr <= nr_latency else nr * min_granularity
+                share = weight[j] * (1 if per_core else cores)
+                return max(min_granularity, period * share // qload[q])
+            return None
+
+        # ---- core state ----
+        pending = [None] * cores                # last segment per core, still growing
+        out = []                                # segments and records of this instant
+        running = [-1] * cores
+        start = [0] * cores
+        run_key = [0] * cores
+        run_end = [0] * cores
+        run_len = [0] * cores                   # planned run, run_end - start without rounding
+        run_slice = [0] * cores
+        run_alone = [False] * cores
+        version = [0] * cores
+        events = []                             # (end, core, version)
+        extended = set()                        # cores running alone past one slice
+        rheap = []                              # global preemption: (-run_key, version, core)
+        idle = list(range(cores - 1, -1, -1))   # stack, lowest core first
+        is_idle = [True] * cores
+        queued = 0
+        busy = 0
+        cursor = 0
+        mark = 0                                # fifo value taken before this instant's arrivals
+        i = 0
+
+        def dispatch(c, t):
+            nonlocal queued, busy, next_boost
+            if next_boost is not None and t >= next_boost:
+                # like mlfq(), a boost is applied at the next scheduling decision
+                for fq in qs:
+                    fq.boost()
+                next_boost = (t // boost + 1) * boost
+            q = core_q[c]
+            src = q
+            if not qs[q]:
+                if not (steal and queued):
+                    if not is_idle[c]:
+                        is_idle[c] = True
+                        idle.append(c)
+                    return
+                src = lengths.longest_queue()
+            key, _, j = qpop(src)
+            queued -= 1
+            if mlfq:
+                if key == 0 and level[j]:
+                    level[j] = 0
+                    slice_left[j] = quanta[0]
+                key = level[j]
+            elif cfs:
+                if src != q:
+                    qload[src] -= weight[j]
+                    qload[q] += weight[j]
+                elif key > qmin[q]:
+                    qmin[q] = key
+            begin = t
+            if last_core[j] >= 0 and last_core[j] != c:
+                begin = _snap(t + migration_cost, arrivals, i)
+            last_core[j] = c
+            left = remaining[j]
+            sl = slice_of(j, q)
+            # alone on its queue: keep the CPU until work shows up there, then
+            # stop at the first slice end at/after that moment (see shorten)
+            alone = sliced and not qs[q] and (not mlfq or key == bottom)
+            if sl is None or sl >= left or alone:
+                run = left
+            else:
+                run = sl
+            end = begin + run
+            running[c] = j
+            start[c] = begin
+            run_end[c] = end
+            run_len[c] = run
+            run_slice[c] = sl
+            run_alone[c] = alone
+            if alone and run > sl:
+                extended.add(c)
+            is_idle[c] = False
+            busy += 1
+            version[c] += 1
+            heapq.heappush(events, (end, c, version[c]))
+            if preemptive:
+                run_key[c] = end if by_finish else key
+                if not per_core:
+                    heapq.heappush(rheap, (-run_key[c], version[c], c))
+
+        def elapsed(c, t):
+            # a run at its planned end (or, for CFS running alone, at a slice
+            # end) has run exactly that long, as in the single-core engines;
+            # t - start may be off by rounding
+            if t >= run_end[c] or _residue(run_end[c] - t, t):
+                return run_len[c]
+            if cfs and c in extended:
+                length = max(1, _slices(t - start[c], run_slice[c])) * run_slice[c]
+                if _residue(abs(start[c] + length - t), t):
+                    return length
+            return t - start[c] if t > start[c] else 0
+
+        def stop(c, t):
+            nonlocal busy
+            j = running[c]
+            ran = elapsed(c, t)
+            seg = pending[c]
+            if ran:
+                pid = pids[j]
+                if first_run[j] is None:
+                    first_run[j] = start[c]
+                if seg is not None and seg[0] == pid and seg[2] == start[c]:
+                    seg = (pid, seg[1], t, c)
+                else:
+                    if seg is not None:
+                        out.append(seg)
+                    seg = (pid, start[c], t, c)
+            left = remaining[j] - ran
+            # judge completion by the finishing instant, and treat a leftover
+            # too small to move the clock as float rounding residue
+            done = t >= start[c] + remaining[j] or _residue(left, t)
+            remaining[j] = 0 if done else left
+            if done and seg is not None:
+                # nothing can extend it any more: emit it ahead of the record
+                out.append(seg)
+                seg = None
+            pending[c] = seg
+            running[c] = -1
+            version[c] += 1
+            busy -= 1
+            extended.discard(c)
+            return j, ran
+
+        def retire(j, q, t):
+            tat = t - arrival[j]
+            wt = tat - procs.burst[j]
+            rt = first_run[j] - arrival[j]
+            out.append({"pid": pids[j], "wt": wt, "tat": tat, "rt": rt})
+            if cfs:
+                qload[q] -= weight[j]
+
+        def shorten(c, t):
+            nonlocal queued
+            # work reached the queue of a core running alone past its slice
+            extended.discard(c)
+            s, sl = start[c], run_slice[c]
+            if cfs:
+                length = max(1, _slices(t - s, sl)) * sl
+            else:
+                step = quanta[level[running[c]]] if mlfq else sl
+                length = sl + _slices(max(0, t - s - sl), step) * step
+            end = s + length
+            if _residue(abs(end - t), t):
+                end = t
+            if cfs and end <= t:
+                # slice ends right now: like cfs(), requeue ahead of this instant's arrivals
+                run_end[c], run_len[c] = end, length
+                j, ran = stop(c, t)
+                if remaining[j] == 0:
+                    retire(j, core_q[c], t)
+                else:
+                    requeue(j, core_q[c], ran, True, c, t, tie=mark - 0.5)
+                    queued += 1
+                dispatch(c, t)
+            elif end < run_end[c]:
+                run_end[c], run_len[c] = end, length
+                version[c] += 1
+                heapq.heappush(events, (end, c, version[c]))
+                if preemptive and not per_core:
+                    heapq.heappush(rheap, (-run_key[c], version[c], c))
+
+        def beats(key, t, c):
+            key = key + t if by_finish else key
+            return key < run_key[c] and not _residue(run_key[c] - key, t)
+
+        def admit(t, freed, touched):
+            nonlocal i, queued, cursor
+            while i < n and arrivals[i] <= t:
+                j = order[i]
+                i += 1
+                if per_core:
+                    while idle and not is_idle[idle[-1]]:
+                        idle.pop()
+                    if idle:
+                        q = idle.pop()
+                        is_idle[q] = False      # claimed; dispatched below
+                        freed.append(q)
+                    else:
+                        q = cursor
+                        cursor = (cursor + 1) % cores
+                else:
+                    q = 0
+                enqueue(j, q, t)
+                queued += 1
+                touched.append(q)
+
+        while True:
+            while events and events[0][2] != version[events[0][1]]:
+                heapq.heappop(events)
+            # an event a rounding step away from an arrival happens with it
+            t = arrivals[i] if i < n else None
+            if events and (t is None or events[0][0] < t and not _residue(t - events[0][0], t)):
+                t = events[0][0]
+            if t is None:
+                break
+            if next_balance is not None and queued and next_balance < t:
+                t = next_balance
+
+            # arrivals at t queue ahead of the slices that end at t, except for
+            # CFS which places them after the running task's vruntime update
+            freed = []
+            touched = []
+            if not cfs:
+                admit(t, freed, touched)
+
+            while events and (events[0][0] <= t or _residue(events[0][0] - t, t)):
+                _, c, ver = heapq.heappop(events)
+                if ver != version[c]:
+                    continue
+                j, ran = stop(c, t)
+                q = core_q[c]
+                if remaining[j] == 0:
+                    retire(j, q, t)
+                else:
+                    requeue(j, q, ran, True, c, t)
+                    queued += 1
+                if cfs and qs[q] and qs[q][0][0] > qmin[q]:
+                    qmin[q] = qs[q][0][0]
+                freed.append(c)
+
+            if cfs:
+                mark = next(fifo)
+                admit(t, freed, touched)
+
+            if next_balance is not None and t >= next_balance:
+                while lengths.longest - lengths.shortest > 1:
+                    hi = lengths.longest_queue()
+                    lo = lengths.shortest_queue()
+                    entry = qpop(hi)
+                    qpush(lo, entry)
+                    if cfs:
+                        qload[hi] -= weight[entry[2]]
+                        qload[lo] += weight[entry[2]]
+                    touched.append(lo)
+                for c in idle:
+                    if is_idle[c] and qs[c]:
+                        freed.append(c)
+                next_balance = (t // balance_interval + 1) * balance_interval
+
+            for c in freed:
+                if running[c] < 0:
+                    dispatch(c, t)
+            if not per_core:
+                while idle and qs[0]:
+                    c = idle.pop()
+                    if is_idle[c]:
+                        dispatch(c, t)
+
+            if extended:
+                if per_core:
+                    for q in set(touched):
+                        if q in extended and qs[q]:
+                            shorten(q, t)
+                elif qs[0]:
+                    for c in list(extended):
+                        shorten(c, t)
+
+            if preemptive and touched:
+                if per_core:
+                    for q in set(touched):
+                        if running[q] >= 0 and qs[q] and beats(qtop(q), t, q):
+                            # a preempted run may end up finished once its
+                            # rounding residue is dropped
+                            j, ran = stop(q, t)
+                            if remaining[j] == 0:
+                                retire(j, q, t)
+                            else:
+                                requeue(j, q, ran, False, q, t)
+                                queued += 1
+                            dispatch(q, t)
+                else:
+                    while qs[0] and rheap:
+                        _, ver, c = rheap[0]
+                        if ver != version[c]:
+                            heapq.heappop(rheap)
+                            continue
+                        if not beats(qtop(0), t, c):
+                            break
+                        heapq.heappop(rheap)
+                        j, ran = stop(c, t)
+                        if remaining[j] == 0:
+                            retire(j, 0, t)
+                        else:
+                            requeue(j, 0, ran, False, c, t)
+                            queued += 1
+                        dispatch(c, t)
+
+            if out:
+                yield from out
+                out.clear()
+            if i >= n and not queued and not busy:
+                break
+
+        for seg in pending:
+            if seg is not None:
+                yield seg
+
+    # ---------- COMPARISON (every algorithm on the same workload) ----------
+    def compare(self, algorithms=None, quantum=2, workers=None):
+        """
+        Run several algorithms on the current processes, one worker process
+        each, and return [{"algorithm": name, **summary}] in the given order
+        (summary as in core.metrics.summarize). The arrival, burst and
+        priority columns are copied once into a shared-memory block that the
+        workers map, so the workload is never pickled per task. Workers see
+        pids 0..n-1; the summary does not depend on the labels.
+        """
+        algorithms = tuple(algorithms or SMP_ALGORITHMS)
+        for algo in algorithms:
+            if algo not in SMP_ALGORITHMS:
+                raise ValueError(f"unknown algorithm: {algo}")
+        procs = self.processes
+        n = len(procs)
+        shm, layout = _share_columns((procs.arrival, procs.burst, procs.priority))
+        try:
+            with ProcessPoolExecutor(max_workers=workers or min(len(algorithms), os.cpu_count() or 1)) as pool:
+                jobs = [pool.submit(_compare_worker, shm.name, n, layout, algo, quantum)
+                        for algo in algorithms]
+                return [{"algorithm": algo, **job.result()} for algo, job in zip(algorithms, jobs)]
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def rr_sweep(self, quanta, metric="tat_mean", workers=None):
+        """
+        Round Robin over every quantum in `quanta`. Returns
+        {"curve": [{"quantum": q, **summary}, ...], "recommended": q} with the
+        curve in the given order; the recommended quantum minimises `metric`,
+        ties going to the one with fewer context switches.
+        The arrival order is sorted once and shipped, together with the
+        columns, through shared memory to the workers, which split the
+        quanta between them. Every quantum >= the longest burst gives the
+        FCFS schedule, so that point is run once and reused.
+        """
+        quanta = list(quanta)
+        if not quanta or min(quanta) <= 0:
+            raise ValueError("need at least one positive quantum")
+        procs = self.processes
+        n = len(procs)
+        longest = max(procs.burst, default=1)
+        todo = sorted({q if q < longest else longest for q in quanta}, reverse=True)
+
+        order = procs.by_arrival()[0]
+        shm, layout = _share_columns((procs.arrival, procs.burst, procs.priority, order))
+        try:
+            workers = min(len(todo), workers or os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # interleave, so small (expensive) quanta spread across workers
+                jobs = [pool.submit(_sweep_worker, shm.name, n, layout, todo[w::workers])
+                        for w in range(workers)]
+                points = {}
+                for job in jobs:
+                    points.update(job.result())
+        finally:
+            shm.close()
+            shm.unlink()
+
+        curve = [{"quantum": q, **points[q if q < longest else longest]} for q in quanta]
+        best = min(curve, key=lambda row: (row[metric], row["context_switches"]))
+        return {"curve": curve, "recommended": best["quantum"]}
+
+    # ---------- REAL-TIME (periodic tasks) ----------
+    def add_task(self, name, period, wcet, deadline=None, offset=0):
+        if deadline is None:
+            deadline = period
+        if not (period > 0 and wcet > 0 and deadline > 0 and offset >= 0):
+            raise ValueError("period, wcet and deadline must be positive, offset non-negative")
+        self.tasks.append({
+            "name": name,
+            "period": period,
+            "wcet": wcet,
+            "deadline": deadline,
+            "offset": offset
+        })
+
+    def _realtime(self, policy, horizon, stream):
+        events = _merged(self._run_realtime(policy, horizon))
+        return events if stream else _collect(events)
+
+    def _run_realtime(self, policy, horizon):
+        # Jobs are released from a heap of next-release times and the CPU is only
+        # re-examined on releases and completions. The run stops at `horizon`
+        # (default offset + 2 hyperperiods) or as soon as the pending work at one
+        # hyperperiod boundary equals that at the previous one: from then on the
+        # schedule repeats exactly.
+        tasks = self.tasks
+        m = len(tasks)
+        if not m:
+            return
+        hyper = hyperperiod(tasks)
+        phase = max(t["offset"] for t in tasks)
+        limit = phase + 2 * hyper if horizon is None else horizon
+        rank = {k: r for r, k in enumerate(sorted(range(m), key=lambda k: (tasks[k]["period"], k)))}
+
+        releases = [(t["offset"], k) for k, t in enumerate(tasks)]
+        heapq.heapify(releases)
+        ready = []              # (key, seq, job); job = [task, release, deadline, remaining]
+        seq = 0
+        stats = [{"jobs": 0, "misses": 0, "rt": [None, None], "start": [None, None]} for _ in range(m)]
+        cur = None
+        cur_key = None
+        seg_start = 0
+        time = 0
+        check = phase
+        snapshot = None
+
+        while True:
+            finish = time + cur[3] if cur is not None else None
+            t = min(x for x in (releases[0][0], finish, check, limit) if x is not None)
+            if cur is not None:
+                cur[3] -= t - time
+            time = t
+
+            if cur is not None and cur[3] == 0:
+                k, release, deadline, _ = cur
+                yield tasks[k]["name"], seg_start, time
+                st = stats[k]
+                st["jobs"] += 1
+                if time > deadline:
+                    st["misses"] += 1
+                rt = time - release
+                lo, hi = st["rt"]
+                st["rt"] = [rt if lo is None or rt < lo else lo, rt if hi is None or rt > hi else hi]
+                cur = None
+
+            if time >= limit:
+                break
+
+            if time == check:
+                state = [(j[0], j[3], j[2] - time) for _, _, j in ready]
+                if cur is not None:
+                    state.append((cur[0], cur[3], cur[2] - time))
+                state.sort()
+                if state == snapshot:
+                    break
+                snapshot = state
+                check += hyper
+
+            while releases[0][0] <= time:
+                r, k = heapq.heappop(releases)
+                task = tasks[k]
+                deadline = r + task["deadline"]
+                key = deadline if policy == "edf" else rank[k]
+                heapq.heappush(ready, (key, seq, [k, r, deadline, task["wcet"]]))
+                seq += 1
+                heapq.heappush(releases, (r + task["period"], k))
+
+            if ready and (cur is None or ready[0][0] < cur_key):
+                if cur is not None:
+                    if time > seg_start:
+                        yield tasks[cur[0]]["name"], seg_start, time
+                    heapq.heappush(ready, (cur_key, seq, cur))
+                    seq += 1
+                cur_key, _, cur = heapq.heappop(ready)
+                seg_start = time
+
+        if cur is not None:
+            if time > seg_start:
+                yield tasks[cur[0]]["name"], seg_start, time
+            ready.append((cur_key, 0, cur))
+        for _, _, j in ready:
+            if j[2] < time:
+                stats[j[0]]["misses"] += 1
+
+        for k, st in enumerate(stats):
+            lo, hi = st["rt"]
+            yield {
+                "task": tasks[k]["name"],
+                "jobs": st["jobs"],
+                "misses": st["misses"],
+                "min_rt": lo,
+                "max_rt": hi,
+                "jitter": hi - lo if hi is not None else None
+            }
+
+    # ---------- EDF (Earliest Deadline First) ----------
+    def edf(self, horizon=None, stream=False):
+        return self._realtime("edf", horizon, stream)
+
+    # ---------- RATE MONOTONIC (shorter period = higher priority) ----------
+    def rate_monotonic(self, horizon=None, stream=False):
+        return self._realtime("rm", horizon, stream)
+
+    def schedulability(self, policy="edf"):
+        """
+        Offline verdict for the periodic task set.
+         - edf: U <= 1 when every deadline equals the period, otherwise the
+                processor-demand test at each absolute deadline up to the bound
+         - rm : Liu & Layland utilisation bound, then exact response-time
+                analysis (worst-case response time per task)
+        """
+        tasks = self.tasks
+        m = len(tasks)
+        u = sum(t["wcet"] / t["period"] for t in tasks)
+        verdict = {"utilization": u, "hyperperiod": hyperperiod(tasks) if m else 0}
+
+        if policy == "edf":
+            implicit = all(t["deadline"] >= t["period"] for t in tasks)
+            verdict["bound"] = 1.0
+            if implicit or u > 1:
+                verdict["test"] = "utilization"
+                verdict["schedulable"] = u <= 1
+                return verdict
+            verdict["test"] = "processor demand"
+            end = verdict["hyperperiod"] + max(t["deadline"] for t in tasks)
+            if u < 1:
+                end = min(end, max(max(t["deadline"] for t in tasks),
+                                   sum((t["period"] - t["deadline"]) * t["wcet"] / t["period"]
+                                       for t in tasks) / (1 - u)))
+            deadlines = sorted({t["deadline"] + n * t["period"]
+                                for t in tasks
+                                for n in range(int((end - t["deadline"]) // t["period"]) + 1)
+                                if t["deadline"] + n * t["period"] <= end})
+            verdict["schedulable"] = all(
+                sum(((d - t["deadline"]) // t["period"] + 1) * t["wcet"]
+                    for t in tasks if d >= t["deadline"]) <= d
+                for d in deadlines)
+            return verdict
+
+        verdict["bound"] = m * (2 ** (1 / m) - 1) if m else 1.0
+        if u <= verdict["bound"]:
+            verdict["test"] = "utilization"
+            verdict["schedulable"] = True
+            return verdict
+        verdict["test"] = "response time"
+        ranked = sorted(tasks, key=lambda t: t["period"])
+        response = {}
+        ok = True
+        for i, t in enumerate(ranked):
+            r = t["wcet"] + sum(h["wcet"] for h in ranked[:i])
+            while r <= t["deadline"]:
+                nxt = t["wcet"] + sum(-(-r // h["period"]) * h["wcet"] for h in ranked[:i])
+                if nxt == r:
+                    break
+                r = nxt
+            response[t["name"]] = r
+            ok = ok and r <= t["deadline"]
+        verdict["response_times"] = response
+        verdict["schedulable"] = ok
+        return verdict
+
+
+# Linux sched_prio_to_weight: nice -20..19, each step is ~10% CPU share
+NICE_0_WEIGHT = 1024
+NICE_TO_WEIGHT = [
+    88761, 71755, 56483, 46273, 36291,
+    29154, 23254, 18705, 14949, 11916,
+    9548, 7620, 6100, 4904, 3906,
+    3121, 2501, 1991, 1586, 1277,
+    1024, 820, 655, 526, 423,
+    335, 272, 215, 172, 137,
+    110, 87, 70, 56, 45,
+    36, 29, 23, 18, 15,
+]
+
+STRIDE1 = 1 << 20
+
+SMP_ALGORITHMS = ("fcfs", "sjf", "priority", "srtf", "priority_preemptive",
+                  "round_robin", "mlfq", "cfs")
+
+
+def _gather(column, order):
+    # column[order[0]], column[order[1]], ... in the column's own array type
+    values = map(column.__getitem__, order)
+    return array(column.typecode, values) if isinstance(column, array) else list(values)
+
+
+def _share_columns(columns):
+    # Copy equal-length numeric columns back to back into one shared-memory
+    # block; the caller closes and unlinks it.
+    columns = [col if isinstance(col, array) else array("d", col) for col in columns]
+    shm = shared_memory.SharedMemory(create=True, size=max(1, sum(c.itemsize * len(c) for c in columns)))
+    offset = 0
+    for col in columns:
+        raw = col.tobytes()
+        shm.buf[offset:offset + len(raw)] = raw
+        offset += len(raw)
+    return shm, tuple(col.typecode for col in columns)
+
+
+def _read_columns(name, n, layout):
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        columns = []
+        offset = 0
+        for code in layout:
+            col = array(code)
+            size = col.itemsize * n
+            col.frombytes(shm.buf[offset:offset + size])
+            columns.append(col)
+            offset += size
+    finally:
+        shm.close()
+    return columns
+
+
+def _compare_worker(name, n, layout, algo, quantum):
+    # Runs in a pool process: map the shared columns, run one algorithm and
+    # send back only its summary.
+    from core.metrics import summarize
+
+    logic = CPULogic.from_arrays(*_read_columns(name, n, layout), pids=range(n))
+    if algo in ("round_robin", "mlfq"):
+        run = getattr(logic, algo)(quantum=quantum)
+    else:
+        run = getattr(logic, algo)()
+    return summarize(*run)
+
+
+def _sweep_worker(name, n, layout, quanta):
+    from core.metrics import summarize
+
+    arrival, burst, priority, order = _read_columns(name, n, layout)
+    logic = CPULogic.from_arrays(arrival, burst, priority, pids=range(n))
+    procs = logic.processes
+    procs._sorted = (procs.version, order, _gather(arrival, order))
+    return {q: summarize(*logic.round_robin(q, merge=True)) for q in quanta}
+
+
+class IncrementalSchedule:
+    """
+    A non-preemptive schedule (fcfs, sjf or priority) kept current while
+    processes come and go. An added process can only change decisions taken
+    at or after its arrival, and a removed one those from its own dispatch
+    on, so only that suffix is replayed. The replay stops as soon as the
+    clock and the set of dispatched processes match the old schedule again,
+    after which the rest is kept as is. Appending a job near the end of the
+    timeline therefore costs O(log n) plus the work it actually displaces.
+    Handles returned by add() identify processes for remove(); ties are
+    broken in the order processes were added, as in CPULogic.
+    """
+
+    KEYS = {"fcfs": "arrival", "sjf": "burst", "priority": "priority"}
+
+    def __init__(self, policy="fcfs"):
+        if policy not in self.KEYS:
+            raise ValueError(f"unknown policy: {policy}")
+        self.policy = policy
+        self.pid = []
+        self.arrival = []
+        self.burst = []
+        self.key = []
+        self.alive = []
+        self.seq = []               # handles in dispatch order
+        self.start = []             # their start times, nondecreasing
+        self.started = []           # handle -> start time
+        self.count = 0
+        self.total_wt = 0
+        self.total_burst = 0
+
+    def add(self, pid, arrival, burst, priority=0, replay=True):
+        h = len(self.pid)
+        self.pid.append(pid)
+        self.arrival.append(arrival)
+        self.burst.append(burst)
+        self.key.append({"arrival": arrival, "burst": burst, "priority": priority}[self.KEYS[self.policy]])
+        self.alive.append(True)
+        self.started.append(None)
+        self.count += 1
+        self.total_burst += burst
+        if replay:
+            self._replay(bisect_left(self.start, arrival), new=h)
+        return h
+
+    def remove(self, h):
+        if not self.alive[h]:
+            raise KeyError(f"process handle {h} already removed")
+        self.alive[h] = False
+        self.count -= 1
+        self.total_burst -= self.burst[h]
+        p = bisect_left(self.start, self.started[h])
+        while self.seq[p] != h:
+            p += 1
+        self._replay(p, removed=h)
+
+    def rebuild(self):
+        """Schedule every live process from scratch."""
+        self.total_wt = 0
+        del self.seq[:], self.start[:]
+        self._replay(0, pool=[h for h, live in enumerate(self.alive) if live])
+
+    def _replay(self, p, new=None, removed=None, pool=None):
+        seq, start = self.seq, self.start
+        arrival, burst, key = self.arrival, self.burst, self.key
+        old = seq[p:]
+        if pool is None:
+            pool = old[1:] if removed is not None else old[:]
+            if new is not None:
+                pool.append(new)
+        pool.sort(key=arrival.__getitem__)
+        time = start[p - 1] + burst[seq[p - 1]] if p else 0
+
+        done = []
+        starts = []
+        delta = set()               # dispatched in the new suffix xor the old one
+        pending = new is not None   # new job not dispatched yet
+        k = 1 if removed is not None else 0
+        ready = []
+        i = 0
+        n = len(pool)
+        while i < n or ready:
+            # back in step with the old schedule: same clock, same jobs left
+            if not pending and not delta and k and time == start[p + k - 1] + burst[old[k - 1]]:
+                break
+            if not ready and arrival[pool[i]] > time:
+                time = arrival[pool[i]]
+            while i < n and arrival[pool[i]] <= time:
+                h = pool[i]
+                heapq.heappush(ready, (key[h], h))
+                i += 1
+            h = heapq.heappop(ready)[1]
+            done.append(h)
+            starts.append(time)
+            time += burst[h]
+            if h == new:
+                pending = False
+                continue
+            delta.symmetric_difference_update((h,))
+            if k < len(old):
+                delta.symmetric_difference_update((old[k],))
+                k += 1
+        else:
+            k = len(old)
+
+        # old[:k] (removed job included) is replaced by the replayed jobs
+        self.total_wt += (sum(starts) - sum(map(arrival.__getitem__, done))
+                          - sum(start[p:p + k]) + sum(map(arrival.__getitem__, old[:k])))
+        seq[p:p + k] = done
+        start[p:p + k] = starts
+        started = self.started
+        for h, t in zip(done, starts):
+            started[h] = t
+
+    def schedule(self):
+        """(gantt, result) exactly as CPULogic.fcfs() / sjf() / priority()."""
+        gantt = []
+        result = []
+        for h, s in zip(self.seq, self.start):
+            end = s + self.burst[h]
+            a = self.arrival[h]
+            gantt.append((self.pid[h], s, end))
+            result.append({"pid": self.pid[h], "wt": s - a, "tat": end - a})
+        return gantt, result
+
+    def summary(self):
+        """Running aggregates, O(1) per call."""
+        n = self.count
+        makespan = self.start[-1] + self.burst[self.seq[-1]] if self.seq else 0
+        total_tat = self.total_wt + self.total_burst
+        return {
+            "processes": n,
+            "makespan": makespan,
+            "busy": self.total_burst,
+            "idle": makespan - self.total_burst,
+            "utilization": self.total_burst / makespan if makespan else 0,
+            "throughput": n / makespan if makespan else 0,
+            "wt_mean": self.total_wt / n if n else 0,
+            "tat_mean": total_tat / n if n else 0,
+        }
+
+
+class _Fenwick:
+    """Binary indexed tree over per-slot weights: add and weighted pick in
+    O(log n)."""
+
+    def __init__(self, n):
+        self.n = n
+        self.tree = [0] * (n + 1)
+        self.total = 0
+        self.top = 1 << n.bit_length() if n else 0
+
+    def add(self, i, delta):
+        self.total += delta
+        i += 1
+        tree = self.tree
+        while i <= self.n:
+            tree[i] += delta
+            i += i & -i
+
+    def find(self, r):
+        # smallest slot whose prefix sum exceeds r (0 <= r < total)
+        tree, n = self.tree, self.n
+        pos = 0
+        bit = self.top
+        while bit:
+            nxt = pos + bit
+            if nxt <= n and tree[nxt] <= r:
+                pos = nxt
+                r -= tree[nxt]
+            bit >>= 1
+        return pos
+
+
+class _FeedbackQueue:
+    """
+    MLFQ run queue. Level 0 is a chain of deques, so a boost appends the lower
+    levels to it in O(levels); callers reset stale per-process levels on pop.
+    """
+
+    def __init__(self, levels):
+        self.top = deque([deque()])
+        self.lower = [deque() for _ in range(levels - 1)]
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, level, j, front=False):
+        q = self.top[-1] if level == 0 else self.lower[level - 1]
+        if front:
+            q.appendleft(j)
+        else:
+            q.append(j)
+        self.size += 1
+
+    def top_level(self):
+        top = self.top
+        while len(top) > 1 and not top[0]:
+            top.popleft()
+        if top[0]:
+            return 0
+        return next(k for k, q in enumerate(self.lower, 1) if q)
+
+    def pop(self):
+        """Return (level it was queued on, process index) of the next process."""
+        lvl = self.top_level()
+        self.size -= 1
+        return lvl, (self.top[0] if lvl == 0 else self.lower[lvl - 1]).popleft()
+
+    def boost(self):
+        if any(self.lower):
+            self.top.extend(q for q in self.lower if q)
+            self.top.append(deque())
+            self.lower = [deque() for _ in self.lower]
+
+
+class _QueueLengths:
+    """
+    Run-queue lengths bucketed by size. Every push or pop moves one queue by
+    one bucket, so the longest and shortest queue are known without a scan.
+    """
+
+    def __init__(self, n):
+        self.length = [0] * n
+        self.buckets = [set(range(n))]
+        self.longest = 0
+        self.shortest = 0
+
+    def grow(self, q):
+        size = self.length[q]
+        self.buckets[size].discard(q)
+        if size == self.shortest and not self.buckets[size]:
+            self.shortest += 1
+        size += 1
+        self.length[q] = size
+        if size == len(self.buckets):
+            self.buckets.append(set())
+        self.buckets[size].add(q)
+        if size > self.longest:
+            self.longest = size
+
+    def shrink(self, q):
+        size = self.length[q]
+        self.buckets[size].discard(q)
+        if size == self.longest and not self.buckets[size]:
+            self.longest -= 1
+        size -= 1
+        self.length[q] = size
+        self.buckets[size].add(q)
+        if size < self.shortest:
+            self.shortest = size
+
+    def longest_queue(self):
+        return next(iter(self.buckets[self.longest]))
+
+    def shortest_queue(self):
+        return next(iter(self.buckets[self.shortest]))
+
+
+def hyperperiod(tasks):
+    """
+    Least common multiple of the task periods. Fractional periods are taken
+    as exact decimals (2.5 -> 5/2), so the result is an int when possible.
+    """
+    num, den = 1, 0
+    for t in tasks:
+        period = t["period"]
+        if isinstance(period, bool) or not isinstance(period, (int, float, Fraction)) or period <= 0:
+            raise ValueError(f"period must be a positive number, got {period!r}")
+        f = Fraction(str(period)) if isinstance(period, float) else Fraction(period)
+        num = num * f.numerator // math.gcd(num, f.numerator)
+        den = math.gcd(den, f.denominator)
+    h = Fraction(num, den or 1)
+    return int(h) if h.denominator == 1 else float(h)
+
+
+# ---------- event streams ----------
+# Every engine is a generator of (pid, start, end) segments and completion
+# records (dicts), in the order they happen; the list-returning methods
+# collect that same stream.
+
+def _merged(events):
+    # Join back-to-back segments of one pid. A record flushes the pending
+    # segment first, so it never comes out ahead of its own last segment.
+    last = None
+    for item in events:
+        if type(item) is tuple:
+            if last is not None:
+                if last[0] == item[0] and last[2] == item[1]:
+                    last = (last[0], last[1], item[2])
+                    continue
+                yield last
+            last = item
+        else:
+            if last is not None:
+                yield last
+                last = None
+            yield item
+    if last is not None:
+        yield last
+
+
+def _collect(events):
+    gantt = []
+    result = []
+    segment, record = gantt.append, result.append
+    for item in events:
+        if type(item) is tuple:
+            segment(item)
+        else:
+            record(item)
+    return gantt, result
+
+
+def _collect_lanes(events, cores):
+    lanes = [[] for _ in range(cores)]
+    result = []
+    for item in events:
+        if type(item) is tuple:
+            lanes[item[3]].append(item[:3])
+        else:
+            result.append(item)
+    return lanes, result
+
+
+def _tolerance(t):
+    # rounding slack around a clock reading t: a thousand-odd ulps, far
+    # below any whole-number time step while t stays under ~1e12
+    return 1024 * math.ulp(max(1.0, abs(t)))
+
+
+def _residue(left, t):
+    # Float arrivals and bursts leave work like 4e-16 behind when a run is
+    # cut at another process's instant; that much work cannot move a clock
+    # reading t, so it counts as done (likewise for the rest of a slice).
+    return left <= _tolerance(t)
+
+
+def _slices(span, step):
+    # ceil(span / step), without an extra slice for rounding residue past a
+    # whole number of them
+    k = -(-span // step)
+    if k > 0 and _residue(span - (k - 1) * step, span):
+        k -= 1
+    return k
+
+
+def _snap(t, arrivals, i):
+    # An end instant computed as start + run can miss an arrival (at index i
+    # or later) at the same instant by a rounding step; it then ends at that
+    # arrival, as smp() does by running such an event with the arrival.
+    k = bisect_left(arrivals, t - _tolerance(t), i)
+    if k < len(arrivals) and _residue(abs(arrivals[k] - t), t):
+        return arrivals[k]
+    return t
+
 
-        return gantt, list(result.values())
+def context_switches(gantt):
+    """Number of times the CPU passes from one process to a different one."""
+    pids = list(map(itemgetter(0), gantt))
+    return sum(map(ne, pids, pids[1:]))
@@ -1,55 +1,826 @@
+import math
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter, deque
+from itertools import accumulate, islice
+from operator import sub
+
+from core.metrics import percentile
+
+try:
+    import numpy as np
+except ImportError:         # optional: the array path falls back to the stdlib
+    np = None
+
+
+class DiskGeometry:
+    """Cylinder range of a disk: 0 .. cylinders - 1. Logical block
+    addresses map to cylinders in runs of `sectors_per_cylinder`."""
+
+    def __init__(self, cylinders=200, sectors_per_cylinder=1):
+        if cylinders < 1:
+            raise ValueError("a disk needs at least one cylinder")
+        if sectors_per_cylinder < 1:
+            raise ValueError("sectors_per_cylinder must be positive")
+        self.cylinders = cylinders
+        self.sectors_per_cylinder = sectors_per_cylinder
+
+    @property
+    def last(self):
+        return self.cylinders - 1
+
+    def check(self, requests, head):
+        if not 0 <= head <= self.last:
+            raise ValueError(f"head {head} is outside cylinders 0..{self.last}")
+        if requests and (min(requests) < 0 or max(requests) > self.last):
+            raise ValueError(f"requests must lie within cylinders 0..{self.last}")
+
+    def cylinders_of(self, lbas):
+        """array('q') of the cylinders holding each LBA."""
+        spc = self.sectors_per_cylinder
+        out = array("q", lbas) if spc == 1 else array("q", map(spc.__rfloordiv__, lbas))
+        if out and (min(out) < 0 or max(out) > self.last):
+            raise ValueError(f"LBA beyond cylinder {self.last}; raise sectors_per_cylinder "
+                             f"(now {spc}) or the cylinder count")
+        return out
+
+    def fraction(self, cylinder):
+        """Position of a cylinder along the disk, 0.0 .. 1.0, for drawing."""
+        return cylinder / self.last if self.last else 0.0
+
+
+def seek_distance(path):
+    """Total head movement along a sequence of cylinders."""
+    return sum(map(abs, map(sub, path[1:], path)))
+
+
 def fcfs(requests, head):
-    seek = 0
-    seq = [head]
-    for r in requests:
-        seek += abs(head - r)
-        head = r
-        seq.append(r)
-    return seq, seek
+    seq = [head, *requests]
+    return seq, seek_distance(seq)
 
 
 def sstf(requests, head):
+    # Served cylinders always form a contiguous run of the sorted distinct
+    # values around the start, so two pointers walk outwards from it. An
+    # equal-distance tie goes to the value listed first; copies of a value
+    # are served together (the next one is 0 away).
+    first = dict(zip(reversed(requests), range(len(requests) - 1, -1, -1)))
+    count = Counter(requests)
+
     seek = 0
     seq = [head]
-    req = requests.copy()
-    while req:
-        c = min(req, key=lambda x: abs(x - head))
+    for c in _sstf_order(sorted(first), first, head):
         seek += abs(head - c)
         head = c
-        seq.append(c)
-        req.remove(c)
+        seq.extend([c] * count[c])
     return seq, seek
 
 
-def scan(requests, head, direction="right", disk_size=200):
-    seek = 0
+def _sstf_order(values, first, head):
+    # distinct sorted cylinders -> service order; first[c] breaks ties
+    lo = bisect_left(values, head) - 1
+    hi = lo + 1
+    while lo >= 0 or hi < len(values):
+        if hi == len(values):
+            take_left = True
+        elif lo < 0:
+            take_left = False
+        else:
+            left, right = head - values[lo], values[hi] - head
+            take_left = left < right or (left == right and first[values[lo]] < first[values[hi]])
+        if take_left:
+            c = values[lo]
+            lo -= 1
+        else:
+            c = values[hi]
+            hi += 1
+        yield c
+        head = c
+
+
+# ---------- SWEEPS (SCAN / C-SCAN / LOOK / C-LOOK) ----------
+# One sort, split at the head: requests at the head's own cylinder are
+# served first, whichever way it moves. Each sweep is monotonic, so the seek
+# total only needs the turning points of the path, not every request.
+def scan(requests, head, direction="right", disk_size=200, geometry=None):
+    """Sweep to the disk edge, then reverse."""
+    return _sweep(requests, head, direction, geometry or DiskGeometry(disk_size), edge=True, circular=False)
+
+
+def c_scan(requests, head, direction="right", geometry=None):
+    """Sweep to the edge, return to the other edge and sweep the same way
+    again. The return trip counts towards the seek total."""
+    return _sweep(requests, head, direction, geometry or DiskGeometry(), edge=True, circular=True)
+
+
+def look(requests, head, direction="right", geometry=None):
+    """SCAN that reverses at the last request instead of the edge."""
+    return _sweep(requests, head, direction, geometry or DiskGeometry(), edge=False, circular=False)
+
+
+def c_look(requests, head, direction="right", geometry=None):
+    """C-SCAN that jumps from the last request to the furthest one left."""
+    return _sweep(requests, head, direction, geometry or DiskGeometry(), edge=False, circular=True)
+
+
+def _sweep(requests, head, direction, geometry, edge, circular):
+    runs, turns = _sweep_runs(sorted(requests), head, direction, geometry, edge, circular)
     seq = [head]
-    left = sorted([r for r in requests if r < head])
-    right = sorted([r for r in requests if r >= head])
-
-    if direction == "left":
-        for r in reversed(left):
-            seek += abs(head - r)
-            head = r
-            seq.append(r)
-        seek += abs(head - 0)
-        head = 0
-        seq.append(0)
-        for r in right:
-            seek += abs(head - r)
-            head = r
-            seq.append(r)
+    for run in runs:
+        seq += run
+    return seq, seek_distance(turns)
+
+
+def _sweep_runs(ordered, head, direction, geometry, edge, circular):
+    # ordered: the sorted requests, a list, array or NumPy array; returns the
+    # runs the head serves after leaving `head`, and the path's turning points
+    if direction not in ("left", "right"):
+        raise ValueError(f"unknown direction: {direction}")
+    if direction == "right":
+        k = bisect_left(ordered, head)
+        first, rest = ordered[k:], ordered[:k]
+        end, other = geometry.last, 0
+        if not circular:
+            rest = rest[::-1]
     else:
-        for r in right:
-            seek += abs(head - r)
-            head = r
-            seq.append(r)
-        seek += abs(head - (disk_size - 1))
-        head = disk_size - 1
-        seq.append(head)
-        for r in reversed(left):
-            seek += abs(head - r)
-            head = r
-            seq.append(r)
+        k = bisect_right(ordered, head)
+        first, rest = ordered[:k][::-1], ordered[k:]
+        end, other = 0, geometry.last
+        if circular:
+            rest = rest[::-1]
 
-    return seq, seek
+    runs = [first]
+    turns = [head, first[-1] if len(first) else head]
+    if edge:
+        runs.append((end,))
+        turns.append(end)
+    if len(rest):
+        if circular and edge:
+            runs.append((other,))
+            turns.append(other)
+        runs.append(rest)
+        turns += (rest[0], rest[-1])
+    return runs, turns
+
+
+# ---------- ARRAY PATH ----------
+# For long traces: cylinders live in array('q') (8 bytes each) instead of
+# lists of int objects, and the sweeps slice and reverse the sorted array
+# in place of per-request appends. With NumPy installed the sort, the
+# concatenation and the step/cumulative sums run in it instead; results
+# are array('q') either way.
+SWEEP_MODES = {             # name -> (edge, circular)
+    "scan": (True, False),
+    "c_scan": (True, True),
+    "look": (False, False),
+    "c_look": (False, True),
+}
+
+
+def trajectory(requests, head, algo="fcfs", direction="right", geometry=None):
+    """Head path (head first, then every cylinder visited) as array('q').
+    `requests` may be any integer sequence, e.g. array('i')."""
+    if algo == "fcfs":
+        path = array("q", [head])
+        if isinstance(requests, array) and requests.typecode == "q":
+            path += requests
+        elif np is not None:
+            path += _as_array(np.asarray(requests))
+        else:
+            path += array("q", requests)
+        return path
+    if algo == "sstf":
+        return array("q", sstf(list(requests), head)[0])
+    if algo not in SWEEP_MODES:
+        raise ValueError(f"unknown disk algorithm: {algo}")
+    if np is not None:
+        ordered = np.sort(np.asarray(requests, dtype=np.int64))
+        runs, _ = _sweep_runs(ordered, head, direction, geometry or DiskGeometry(), *SWEEP_MODES[algo])
+        return _as_array(np.concatenate(([head], *runs)))
+    ordered = array("q", sorted(requests))
+    runs, _ = _sweep_runs(ordered, head, direction, geometry or DiskGeometry(), *SWEEP_MODES[algo])
+    path = array("q", [head])
+    for run in runs:
+        path += run if isinstance(run, array) else array("q", run)
+    return path
+
+
+def _as_array(values):
+    # NumPy integers -> array('q'), copied once
+    out = array("q")
+    out.frombytes(memoryview(np.ascontiguousarray(values, dtype=np.int64)).cast("B"))
+    return out
+
+
+def stream_seek(chunks, head, algo="fcfs", direction="right", geometry=None):
+    """
+    Total seek of a request queue too large for memory, given as chunks of
+    cylinders (e.g. BlockTrace.cylinders()). FCFS keeps only the previous
+    cylinder; the others keep a request count and first position per
+    cylinder, so memory is O(cylinders) however long the queue is, and the
+    result equals the in-memory function's seek total.
+    """
+    geometry = geometry or DiskGeometry()
+    if algo == "fcfs":
+        seek = 0
+        for chunk in chunks:
+            if len(chunk):
+                seek += abs(chunk[0] - head) + seek_distance(chunk)
+                head = chunk[-1]
+        return seek
+    if algo != "sstf" and algo not in SWEEP_MODES:
+        raise ValueError(f"unknown disk algorithm: {algo}")
+
+    first = array("q", [-1]) * geometry.cylinders
+    offset = 0
+    for chunk in chunks:
+        if len(chunk) and (min(chunk) < 0 or max(chunk) > geometry.last):
+            raise ValueError(f"requests must lie within cylinders 0..{geometry.last}")
+        seen = dict(zip(reversed(chunk), range(offset + len(chunk) - 1, offset - 1, -1)))
+        for c, i in seen.items():
+            if first[c] < 0:
+                first[c] = i
+        offset += len(chunk)
+    # repeats of a cylinder add no movement, so the distinct ones suffice
+    values = [c for c in range(geometry.cylinders) if first[c] >= 0]
+
+    if algo == "sstf":
+        return seek_distance([head, *_sstf_order(values, first, head)])
+    _, turns = _sweep_runs(values, head, direction, geometry, *SWEEP_MODES[algo])
+    return seek_distance(turns)
+
+
+def seek_profile(path):
+    """(steps, cumulative) arrays for a head path: steps[i] is the movement
+    from path[i] to path[i + 1], cumulative[i] the total up to there, so the
+    overall seek is cumulative[-1]."""
+    if np is not None:
+        steps = np.abs(np.diff(np.asarray(path, dtype=np.int64)))
+        return _as_array(steps), _as_array(np.cumsum(steps))
+    steps = array("q", map(abs, map(sub, islice(path, 1, None), path)))
+    return steps, array("q", accumulate(steps))
+
+
+# ---------- ONLINE (timed arrivals) ----------
+def online(requests, arrivals, head, algo="fcfs", direction="right", geometry=None,
+           seek_time=1.0, service_time=0.0):
+    """
+    Event-driven run where request i only becomes visible at arrivals[i].
+    The head moves one cylinder per `seek_time` and spends `service_time`
+    on each request; with nothing pending it waits where it is. Schedulers
+    pick among pending requests only (FIFO within a cylinder):
+     - fcfs         : earliest arrival
+     - sstf         : nearest cylinder; a tie goes to the earlier arrival
+     - look / c_look: next pending cylinder ahead; at the end, reverse
+                      (look) or jump to the furthest pending one (c_look)
+     - scan / c_scan: like look / c_look, but first travel to the disk
+                      edge (c_scan then returns to the other edge)
+    A trip to the edge, once started, is finished before looking again.
+    Pending cylinders sit in a Fenwick tree, so each decision is
+    O(log cylinders) and a run is O(n log n) overall.
+    Returns a dict with the service order, completion and response times,
+    response mean/p50/p99/max, total seek, and the queue depth (arrived,
+    not yet completed) as change points plus its time-weighted mean.
+    """
+    n = len(requests)
+    if len(arrivals) != n:
+        raise ValueError("requests and arrivals differ in length")
+    if direction not in ("left", "right"):
+        raise ValueError(f"unknown direction: {direction}")
+    if algo != "fcfs" and algo != "sstf" and algo not in SWEEP_MODES:
+        raise ValueError(f"unknown disk algorithm: {algo}")
+    geometry = geometry or DiskGeometry()
+    geometry.check(requests, head)
+    edge, circular = SWEEP_MODES.get(algo, (False, False))
+    right = direction == "right"
+
+    by_arrival = sorted(range(n), key=arrivals.__getitem__)
+    rank = array("q", bytes(8 * n))         # arrival rank, for tie-breaks
+    for r, j in enumerate(by_arrival):
+        rank[j] = r
+    waiting = {}                            # cylinder -> deque of requests
+    occupied = _Occupancy(geometry.cylinders)
+    fifo = deque()
+
+    order = array("q")
+    completion = array("d", bytes(8 * n))
+    depth_times, depths = array("d"), array("q")
+    depth = 0
+    area = 0.0
+    seek = 0
+    time = 0.0
+    i = 0
+
+    def move(to):
+        nonlocal head, seek, time
+        seek += abs(to - head)
+        time += abs(to - head) * seek_time
+        head = to
+
+    while i < n or depth:
+        if not depth and arrivals[by_arrival[i]] > time:
+            time = arrivals[by_arrival[i]]
+        while i < n and arrivals[by_arrival[i]] <= time:
+            j = by_arrival[i]
+            t = arrivals[j]
+            area += depth * (t - (depth_times[-1] if depth_times else t))
+            depth += 1
+            depth_times.append(t)
+            depths.append(depth)
+            if algo == "fcfs":
+                fifo.append(j)
+            else:
+                c = requests[j]
+                if c in waiting:
+                    waiting[c].append(j)
+                else:
+                    waiting[c] = deque((j,))
+                    occupied.add(c, 1)
+            i += 1
+
+        if algo == "fcfs":
+            j = fifo.popleft()
+            move(requests[j])
+        else:
+            if algo == "sstf":
+                lo, hi = occupied.below(head), occupied.above(head)
+                if lo is None or (hi is not None and (hi - head < head - lo or (
+                        hi - head == head - lo and rank[waiting[hi][0]] < rank[waiting[lo][0]]))):
+                    c = hi
+                else:
+                    c = lo
+            else:
+                c = occupied.above(head) if right else occupied.below(head)
+                if c is None:
+                    end, other = (geometry.last, 0) if right else (0, geometry.last)
+                    if edge and head != end:
+                        move(end)
+                        continue                # new arrivals may now be ahead
+                    if not circular:
+                        right = not right
+                        continue
+                    if edge:
+                        move(other)
+                        continue
+                    c = occupied.below(geometry.last) if not right else occupied.above(0)
+            move(c)
+            queue = waiting[c]
+            j = queue.popleft()
+            if not queue:
+                del waiting[c]
+                occupied.add(c, -1)
+
+        time += service_time
+        order.append(j)
+        completion[j] = time
+        area += depth * (time - depth_times[-1])
+        depth -= 1
+        depth_times.append(time)
+        depths.append(depth)
+
+    response = array("d", map(sub, completion, arrivals))
+    ordered = sorted(response)
+    span = depth_times[-1] - depth_times[0] if depth_times else 0
+    return {
+        "order": order,
+        "completion": completion,
+        "response": response,
+        "response_mean": sum(ordered) / n if n else 0,
+        "response_p50": percentile(ordered, 50),
+        "response_p99": percentile(ordered, 99),
+        "response_max": ordered[-1] if n else 0,
+        "seek": seek,
+        "depth_times": depth_times,
+        "depths": depths,
+        "depth_max": max(depths, default=0),
+        "depth_mean": area / span if span else 0,
+    }
+
+
+class _Occupancy:
+    """Fenwick tree counting pending cylinders; nearest occupied cylinder at
+    or below / at or above a position in O(log cylinders)."""
+
+    def __init__(self, size):
+        self.size = size
+        self.tree = array("q", bytes(8 * (size + 1)))
+        self.total = 0
+        self.top = 1 << size.bit_length()
+
+    def add(self, c, delta):
+        self.total += delta
+        c += 1
+        tree = self.tree
+        while c <= self.size:
+            tree[c] += delta
+            c += c & -c
+
+    def count(self, c):
+        # occupied cylinders in 0 .. c - 1
+        tree = self.tree
+        total = 0
+        while c > 0:
+            total += tree[c]
+            c -= c & -c
+        return total
+
+    def kth(self, k):
+        # the k-th (0-based) occupied cylinder
+        tree, size = self.tree, self.size
+        pos = 0
+        bit = self.top
+        while bit:
+            nxt = pos + bit
+            if nxt <= size and tree[nxt] <= k:
+                pos = nxt
+                k -= tree[nxt]
+            bit >>= 1
+        return pos
+
+    def below(self, c):
+        k = self.count(c + 1)
+        return self.kth(k - 1) if k else None
+
+    def above(self, c):
+        k = self.count(c)
+        return self.kth(k) if k < self.total else None
+
+
+# ---------- MECHANICS (SPTF / SATF) ----------
+class DiskMechanics:
+    """
+    Service-time model of a hard disk, times in milliseconds.
+     - layout  : `cylinders` x `heads` tracks of `sectors_per_track` sectors;
+                 LBAs fill a track, then the next head, then the next cylinder
+     - seek    : 0 on the same cylinder, otherwise `settle` plus a square
+                 root curve from `track_to_track` (1 cylinder) to
+                 `full_stroke` (cylinders - 1); `seek_curve` replaces the
+                 curve with any non-decreasing f(distance)
+     - rotation: platters spin at `rpm` from angle 0 at time 0; a head
+                 switch within a cylinder costs `settle`
+    """
+
+    def __init__(self, cylinders=65536, heads=4, sectors_per_track=1024, rpm=7200,
+                 track_to_track=0.8, full_stroke=16.0, settle=0.5, seek_curve=None):
+        if min(cylinders, heads, sectors_per_track, rpm) <= 0:
+            raise ValueError("disk dimensions and rpm must be positive")
+        self.cylinders = cylinders
+        self.heads = heads
+        self.sectors_per_track = sectors_per_track
+        self.rpm = rpm
+        self.track_to_track = track_to_track
+        self.full_stroke = full_stroke
+        self.settle = settle
+        self.seek_curve = seek_curve
+        self.revolution = 60000 / rpm
+        self.geometry = DiskGeometry(cylinders, heads * sectors_per_track)
+
+    def seek_time(self, distance):
+        if distance == 0:
+            return 0.0
+        if self.seek_curve is not None:
+            return self.settle + self.seek_curve(distance)
+        span = self.cylinders - 2
+        frac = math.sqrt((distance - 1) / span) if span > 0 else 0.0
+        return self.settle + self.track_to_track + (self.full_stroke - self.track_to_track) * frac
+
+    def locate(self, lba):
+        """(cylinder, head, sector) of a logical block."""
+        track, sector = divmod(lba, self.sectors_per_track)
+        cylinder, head = divmod(track, self.heads)
+        if not 0 <= cylinder < self.cylinders:
+            raise ValueError(f"LBA {lba} is beyond the disk")
+        return cylinder, head, sector
+
+    def positioning(self, cylinder, head, time, to_cylinder, to_head, sector):
+        """(seek, rotational wait) to reach a sector from `cylinder`/`head`
+        at `time`."""
+        seek = self.seek_time(abs(to_cylinder - cylinder))
+        if seek == 0 and head != to_head:
+            seek = self.settle
+        rev = self.revolution
+        wait = (sector / self.sectors_per_track - (time + seek) / rev) % 1.0 * rev
+        return seek, wait
+
+    def transfer_time(self, sectors):
+        return sectors / self.sectors_per_track * self.revolution
+
+
+def mechanical(model, lbas, sectors=None, arrivals=None, policy="sptf", start=0):
+    """
+    Run a request stream on a DiskMechanics model, starting at LBA `start`'s
+    track. Request i reads `sectors[i]` (default 1) from lbas[i] and becomes
+    pending at arrivals[i] (default 0 ms).
+     - fcfs: arrival order
+     - sptf: shortest seek + rotational wait
+     - satf: shortest seek + rotational wait + transfer
+    Ties go to the earlier arrival. SPTF/SATF search outward from the head's
+    cylinder over a Fenwick tree of pending cylinders and stop once the seek
+    alone exceeds the best time found; within a cylinder requests are sorted
+    by sector and walked in rotation order from where the head arrives, so
+    a decision touches only the requests that could still win.
+    Returns order, completion and response times with mean/p50/p99/max, and
+    the seek / rotation / transfer totals.
+    """
+    if policy not in ("fcfs", "sptf", "satf"):
+        raise ValueError(f"unknown policy: {policy}")
+    n = len(lbas)
+    sectors = sectors if sectors is not None else [1] * n
+    arrivals = arrivals if arrivals is not None else [0.0] * n
+    if len(sectors) != n or len(arrivals) != n:
+        raise ValueError("lbas, sectors and arrivals differ in length")
+    where = list(map(model.locate, lbas))
+    transfer = list(map(model.transfer_time, sectors))
+    cylinder, head, _ = model.locate(start)
+    spt = model.sectors_per_track
+    rev = model.revolution
+    with_transfer = policy == "satf"
+
+    by_arrival = sorted(range(n), key=arrivals.__getitem__)
+    rank = [0] * n
+    for r, j in enumerate(by_arrival):
+        rank[j] = r
+    fifo = deque()
+    waiting = {}                            # cylinder -> sorted [(sector, rank, j)]
+    occupied = _Occupancy(model.cylinders)
+    pending = 0
+
+    order = array("q")
+    completion = array("d", bytes(8 * n))
+    totals = {"seek": 0.0, "rotation": 0.0, "transfer": 0.0}
+    time = 0.0
+    i = 0
+
+    while i < n or pending:
+        if not pending and arrivals[by_arrival[i]] > time:
+            time = arrivals[by_arrival[i]]
+        while i < n and arrivals[by_arrival[i]] <= time:
+            j = by_arrival[i]
+            if policy == "fcfs":
+                fifo.append(j)
+            else:
+                c, _, s = where[j]
+                if c not in waiting:
+                    waiting[c] = []
+                    occupied.add(c, 1)
+                insort(waiting[c], (s, rank[j], j))
+            pending += 1
+            i += 1
+
+        if policy == "fcfs":
+            j = fifo.popleft()
+            seek, wait = model.positioning(cylinder, head, time, *where[j])
+        else:
+            best = None                     # (cost, rank, j, seek, wait, cylinder, slot)
+            lo, hi = occupied.below(cylinder - 1) if cylinder else None, occupied.above(cylinder)
+            while lo is not None or hi is not None:
+                if hi is None or (lo is not None and cylinder - lo < hi - cylinder):
+                    c, lo = lo, occupied.below(lo - 1) if lo else None
+                else:
+                    c, hi = hi, occupied.above(hi + 1) if hi + 1 < model.cylinders else None
+                base = model.seek_time(abs(c - cylinder))
+                if best is not None and base > best[0]:
+                    break                   # every remaining cylinder is further away
+                queue = waiting[c]
+                turn = (time + base) / rev
+                under = turn % 1.0 * spt        # sector position under the head
+                first = bisect_left(queue, (under - 0.5,))
+                for k in range(len(queue)):
+                    slot = (first + k) % len(queue)
+                    s, r, j = queue[slot]
+                    # lower bound: the wait for this sector from the earliest
+                    # arrival; it grows along the walk, except for a sector
+                    # within half a sector behind the head, where rounding
+                    # decides between no wait and a whole revolution
+                    if best is not None and base + (s / spt - turn) % 1.0 * rev > best[0] + 1e-9:
+                        if under - 0.5 <= s < under:
+                            continue
+                        break
+                    seek, wait = model.positioning(cylinder, head, time, *where[j])
+                    cost = seek + wait + (transfer[j] if with_transfer else 0.0)
+                    if best is None or (cost, r) < best[:2]:
+                        best = (cost, r, j, seek, wait, c, slot)
+            _, _, j, seek, wait, c, slot = best
+            queue = waiting[c]
+            del queue[slot]
+            if not queue:
+                del waiting[c]
+                occupied.add(c, -1)
+
+        pending -= 1
+        time += seek + wait + transfer[j]
+        cylinder, head, _ = where[j]
+        totals["seek"] += seek
+        totals["rotation"] += wait
+        totals["transfer"] += transfer[j]
+        order.append(j)
+        completion[j] = time
+
+    response = array("d", map(sub, completion, arrivals))
+    ordered = sorted(response)
+    return {
+        "order": order,
+        "completion": completion,
+        "response": response,
+        "response_mean": sum(ordered) / n if n else 0,
+        "response_p50": percentile(ordered, 50),
+        "response_p99": percentile(ordered, 99),
+        "response_max": ordered[-1] if n else 0,
+        **totals,
+    }
+
+
+# ---------- BLOCK LAYER (merging, deadline, fair queues) ----------
+def block_layer(lbas, sectors=None, arrivals=None, writes=None, procs=None, scheduler="deadline",
+                model=None, merge=True, max_sectors=1024, read_expire=500.0, write_expire=5000.0,
+                fifo_batch=16, writes_starved=2, quantum=4, start=0):
+    """
+    Block-layer stage in front of a DiskMechanics model (the default one if
+    none is given), which serves one dispatched request at a time.
+     - merging  : an arriving request joins a pending one of the same
+                  direction that it touches or overlaps (back merge: it
+                  starts inside or right after it; front merge: it ends
+                  inside or right before it), and bridges two pending ones
+                  into one, as long as the result spans <= `max_sectors`
+     - noop     : dispatch in arrival order
+     - deadline : mq-deadline style; reads and writes each keep a FIFO with
+                  an expiry (`read_expire` / `write_expire` ms after arrival)
+                  and an LBA-sorted list. Dispatch goes in batches of up to
+                  `fifo_batch` in ascending LBA order; reads are preferred
+                  until writes have been passed over `writes_starved` times,
+                  and a batch starts from the oldest request once it expired
+     - fair     : one FIFO per process (`procs`, default all 0), served
+                  round robin, `quantum` dispatches per turn
+    A merged request belongs to the process and FIFO slot of the request it
+    grew from and keeps the earliest deadline. Times are in ms.
+    Returns per-request completion and response times with mean/p50/p99/max,
+    the number of dispatches and merges, makespan, throughput (requests/s)
+    and each process's mean response.
+    """
+    if scheduler not in ("noop", "deadline", "fair"):
+        raise ValueError(f"unknown scheduler: {scheduler}")
+    n = len(lbas)
+    model = model or DiskMechanics()
+    sectors = sectors if sectors is not None else [1] * n
+    arrivals = arrivals if arrivals is not None else [0.0] * n
+    writes = writes if writes is not None else [0] * n
+    procs = procs if procs is not None else [0] * n
+    if not len(sectors) == len(arrivals) == len(writes) == len(procs) == n:
+        raise ValueError("request columns differ in length")
+
+    # dispatch units, grown by merges
+    first, last = [], []                    # LBA range [first, last)
+    unit_write, unit_proc, deadline, members, alive = [], [], [], [], []
+    by_lba = ([], [])                       # per direction: sorted [(first, unit)]
+    fifo = (deque(), deque())               # deadline: per direction
+    queues = {}                             # fair / noop: proc -> deque of units
+    turn = deque()                          # fair: processes with a backlog
+    expire = (read_expire, write_expire)
+
+    def unlink(u):
+        lst = by_lba[unit_write[u]]
+        del lst[bisect_left(lst, (first[u], u))]
+
+    def try_merge(q):
+        a, b, w = lbas[q], lbas[q] + sectors[q], writes[q]
+        lst = by_lba[w]
+        i = bisect_right(lst, (a, n)) - 1   # last unit starting at or before a
+        host = None
+        if i >= 0:
+            u = lst[i][1]
+            if last[u] >= a and max(last[u], b) - first[u] <= max_sectors:
+                last[u] = max(last[u], b)
+                members[u].append(q)
+                host = u
+        if i + 1 < len(lst):
+            v = lst[i + 1][1]
+            if host is None:
+                if b >= first[v] and max(last[v], b) - a <= max_sectors:
+                    unlink(v)
+                    first[v] = a
+                    last[v] = max(last[v], b)
+                    insort(lst, (a, v))
+                    members[v].append(q)
+                    host = v
+            elif last[host] >= first[v] and max(last[host], last[v]) - first[host] <= max_sectors:
+                unlink(v)
+                alive[v] = False
+                last[host] = max(last[host], last[v])
+                members[host] += members[v]
+                deadline[host] = min(deadline[host], deadline[v])
+                merges[0] += 1
+        if host is not None:
+            merges[0] += 1
+        return host is not None
+
+    def add_unit(q):
+        u = len(first)
+        w = writes[q]
+        first.append(lbas[q])
+        last.append(lbas[q] + sectors[q])
+        unit_write.append(w)
+        unit_proc.append(procs[q])
+        deadline.append(arrivals[q] + expire[w])
+        members.append([q])
+        alive.append(True)
+        insort(by_lba[w], (lbas[q], u))
+        if scheduler == "deadline":
+            fifo[w].append(u)
+        else:
+            key = procs[q] if scheduler == "fair" else 0
+            if key not in queues:
+                queues[key] = deque()
+            if not queues[key]:
+                turn.append(key)
+            queues[key].append(u)
+
+    def oldest(queue):
+        while queue and not alive[queue[0]]:
+            queue.popleft()
+        return queue[0] if queue else None
+
+    merges = [0]
+    batch_dir, batch_left, starved = 0, 0, 0
+    next_pos = [0, 0]
+    served = 0                              # fair: dispatches in the current turn
+
+    def pick():
+        nonlocal batch_dir, batch_left, starved, served
+        if scheduler == "deadline":
+            if batch_left:
+                lst = by_lba[batch_dir]
+                j = bisect_left(lst, (next_pos[batch_dir], -1))
+                if j < len(lst):
+                    batch_left -= 1
+                    return lst[j][1]
+            read, write = oldest(fifo[0]), oldest(fifo[1])
+            if read is not None and (write is None or starved < writes_starved):
+                batch_dir = 0
+                starved += write is not None
+            else:
+                batch_dir, starved = 1, 0
+            expired = read if batch_dir == 0 else write
+            lst = by_lba[batch_dir]
+            j = bisect_left(lst, (next_pos[batch_dir], -1))
+            batch_left = fifo_batch - 1
+            return expired if deadline[expired] <= time or j == len(lst) else lst[j][1]
+        while True:
+            key = turn[0]
+            u = oldest(queues[key])
+            if u is None:
+                turn.popleft()
+            elif served >= quantum:
+                turn.rotate(-1)
+            else:
+                served += 1
+                return u
+            served = 0
+
+    by_arrival = sorted(range(n), key=arrivals.__getitem__)
+    completion = array("d", bytes(8 * n))
+    cylinder, head, _ = model.locate(start)
+    dispatched = 0
+    time = 0.0
+    i = 0
+
+    # by_lba holds exactly the units still waiting for dispatch
+    while i < n or by_lba[0] or by_lba[1]:
+        if not (by_lba[0] or by_lba[1]) and arrivals[by_arrival[i]] > time:
+            time = arrivals[by_arrival[i]]
+        while i < n and arrivals[by_arrival[i]] <= time:
+            q = by_arrival[i]
+            if not (merge and try_merge(q)):
+                add_unit(q)
+            i += 1
+        u = pick()
+        unlink(u)
+        alive[u] = False
+        w = unit_write[u]
+        next_pos[w] = last[u]
+        c, h, s = model.locate(first[u])
+        seek, wait = model.positioning(cylinder, head, time, c, h, s)
+        time += seek + wait + model.transfer_time(last[u] - first[u])
+        cylinder, head = c, h
+        dispatched += 1
+        for q in members[u]:
+            completion[q] = time
+
+    response = array("d", map(sub, completion, arrivals))
+    ordered = sorted(response)
+    per_proc = {}
+    for p, r in zip(procs, response):
+        total, count = per_proc.get(p, (0.0, 0))
+        per_proc[p] = (total + r, count + 1)
+    return {
+        "completion": completion,
+        "response": response,
+        "response_mean": sum(ordered) / n if n else 0,
+        "response_p50": percentile(ordered, 50),
+        "response_p99": percentile(ordered, 99),
+        "response_max": ordered[-1] if n else 0,
+        "dispatched": dispatched,
+        "merges": merges[0],
+        "makespan": time,
+        "throughput": n / time * 1000 if time else 0,
+        "process_mean": {p: total / count for p, (total, count) in per_proc.items()},
+    }
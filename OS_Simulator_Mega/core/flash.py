@@ -0,0 +1,261 @@
+# core/flash.py
+import heapq
+import math
+import random
+from array import array
+
+from core.metrics import percentile
+
+
+class FlashDevice:
+    """
+    Page-mapped flash translation layer, times in microseconds.
+     - geometry : `blocks` erase blocks of `pages_per_block` pages of
+                  `page_size` bytes; `over_provisioning` of the raw pages is
+                  hidden from the host
+     - mapping  : logical -> physical and physical -> logical page tables in
+                  array('i'), 4 bytes per page each way (about 2.3 GB of
+                  tables for 1 TB of 4 KB pages); -1 marks unmapped/invalid
+     - writes   : host writes and GC copies fill separate open blocks, so
+                  cold GC survivors are not mixed with fresh host data
+     - GC       : when free blocks drop to `gc_threshold`, a host write
+                  stalls while victims are collected: "greedy" takes the
+                  block with the fewest valid pages, "cost_benefit" the best
+                  age * (1 - u) / 2u among the `window` emptiest blocks
+     - wear     : free blocks are handed out least-erased first; every
+                  `wl_interval` erasures, if the erase-count spread exceeds
+                  `wl_threshold`, the least-erased block's data is moved so
+                  that block returns to circulation
+    Full blocks sit in buckets by valid-page count, so finding a victim
+    never scans the whole device.
+    """
+
+    GC_POLICIES = ("greedy", "cost_benefit")
+
+    def __init__(self, blocks=1024, pages_per_block=256, page_size=4096, over_provisioning=0.07,
+                 gc="greedy", gc_threshold=4, window=256, wl_interval=1000, wl_threshold=100,
+                 read_us=50.0, program_us=500.0, erase_us=3000.0):
+        if gc not in self.GC_POLICIES:
+            raise ValueError(f"unknown GC policy: {gc}")
+        if not 0 < over_provisioning < 1:
+            raise ValueError("over_provisioning must lie between 0 and 1")
+        self.blocks = blocks
+        self.pages_per_block = pages_per_block
+        self.page_size = page_size
+        self.logical_pages = int(blocks * pages_per_block * (1 - over_provisioning))
+        if blocks - math.ceil(self.logical_pages / pages_per_block) < gc_threshold + 2:
+            raise ValueError("over-provisioning leaves too few spare blocks for GC")
+        self.gc = gc
+        self.gc_threshold = gc_threshold
+        self.window = window
+        self.wl_interval = wl_interval
+        self.wl_threshold = wl_threshold
+        self.read_us = read_us
+        self.program_us = program_us
+        self.erase_us = erase_us
+
+        pages = blocks * pages_per_block
+        self.l2p = array("i", [-1]) * self.logical_pages
+        self.p2l = array("i", [-1]) * pages
+        self.valid = array("i", bytes(4 * blocks))
+        self.erases = array("i", bytes(4 * blocks))
+        self.stamp = array("d", bytes(8 * blocks))     # last program time
+        self.sealed = [set() for _ in range(pages_per_block + 1)]   # by valid count
+        self.free = [(0, b) for b in range(blocks)]     # (erases, block) heap
+        self.open = {"host": None, "gc": None}          # kind -> [block, next page]
+
+        self.clock = 0.0
+        self.host_writes = 0
+        self.gc_writes = 0
+        self.total_erases = 0
+        self.gc_times = array("d")
+        self.gc_stalls = array("d")
+        self.gc_copied = array("i")
+
+    @classmethod
+    def for_capacity(cls, capacity, page_size=4096, pages_per_block=256, over_provisioning=0.07, **params):
+        """Device exposing at least `capacity` bytes to the host."""
+        pages = math.ceil(capacity / page_size / (1 - over_provisioning))
+        return cls(math.ceil(pages / pages_per_block) + params.get("gc_threshold", 4) + 2,
+                   pages_per_block, page_size, over_provisioning, **params)
+
+    # ---------- HOST OPERATIONS ----------
+    def read(self, lpn):
+        self._check(lpn)
+        return self.read_us
+
+    def write(self, lpn):
+        """Write one logical page; returns its latency including any GC
+        stall it triggered."""
+        self._check(lpn)
+        old = self.l2p[lpn]
+        if old >= 0:
+            self._invalidate(old)
+        self._program("host", lpn)
+        self.host_writes += 1
+        stall = 0.0
+        while len(self.free) <= self.gc_threshold:
+            stall += self._collect(self._victim())
+        if stall:
+            self.gc_times.append(self.clock)
+            self.gc_stalls.append(stall)
+        return self.program_us + stall
+
+    def trim(self, lpn):
+        self._check(lpn)
+        old = self.l2p[lpn]
+        if old >= 0:
+            self._invalidate(old)
+            self.l2p[lpn] = -1
+
+    def fill(self, order="sequential", seed=None):
+        """Write every logical page once, untimed, to reach steady state."""
+        lpns = range(self.logical_pages)
+        if order == "random":
+            lpns = array("i", lpns)
+            random.Random(seed).shuffle(lpns)
+        for lpn in lpns:
+            self.write(lpn)
+
+    def replay(self, lpns, writes=None, arrivals=None):
+        """
+        Serve (lpn, write) requests one at a time, in order, each starting
+        at max(arrival, device free). Returns write amplification, response
+        mean/p50/p99/max, erase counts, and the GC events as time series:
+        gc_times (device clock at the stalled write), gc_stalls (stall
+        length) and gc_copied (pages moved by each collection). Writes,
+        erases and GC events count this replay only, not an earlier fill();
+        erase_min/erase_max are the blocks' lifetime counts.
+        """
+        host0, gc0, erases0 = self.host_writes, self.gc_writes, self.total_erases
+        events0, copies0 = len(self.gc_times), len(self.gc_copied)
+        n = len(lpns)
+        writes = writes if writes is not None else [1] * n
+        arrivals = arrivals if arrivals is not None else [0.0] * n
+        response = array("d", bytes(8 * n))
+        busy = self.clock
+        for i, (lpn, write, at) in enumerate(zip(lpns, writes, arrivals)):
+            self.clock = start = max(at, busy)
+            busy = start + (self.write(lpn) if write else self.read(lpn))
+            response[i] = busy - at
+        self.clock = busy
+        ordered = sorted(response)
+        host, gc = self.host_writes - host0, self.gc_writes - gc0
+        return {
+            "write_amplification": (host + gc) / host if host else 0.0,
+            "host_writes": host,
+            "gc_writes": gc,
+            "erases": self.total_erases - erases0,
+            "erase_min": min(self.erases),
+            "erase_max": max(self.erases),
+            "response_mean": sum(ordered) / n if n else 0,
+            "response_p50": percentile(ordered, 50),
+            "response_p99": percentile(ordered, 99),
+            "response_max": ordered[-1] if n else 0,
+            "gc_times": self.gc_times[events0:],
+            "gc_stalls": self.gc_stalls[events0:],
+            "gc_copied": self.gc_copied[copies0:],
+        }
+
+    def write_amplification(self):
+        """Flash page programs per host page written, over the device's
+        lifetime (replay() reports its own window)."""
+        return (self.host_writes + self.gc_writes) / self.host_writes if self.host_writes else 0.0
+
+    # ---------- FTL INTERNALS ----------
+    def _check(self, lpn):
+        if not 0 <= lpn < self.logical_pages:
+            raise ValueError(f"logical page {lpn} outside 0..{self.logical_pages - 1}")
+
+    def _invalidate(self, ppn):
+        b = ppn // self.pages_per_block
+        self.p2l[ppn] = -1
+        count = self.valid[b]
+        if b in self.sealed[count]:
+            self.sealed[count].remove(b)
+            self.sealed[count - 1].add(b)
+        self.valid[b] = count - 1
+
+    def _program(self, kind, lpn):
+        frontier = self.open[kind]
+        if frontier is None or frontier[1] == self.pages_per_block:
+            if frontier is not None:
+                self.sealed[self.valid[frontier[0]]].add(frontier[0])
+            _, b = heapq.heappop(self.free)
+            frontier = self.open[kind] = [b, 0]
+        b, page = frontier
+        ppn = b * self.pages_per_block + page
+        frontier[1] = page + 1
+        self.l2p[lpn] = ppn
+        self.p2l[ppn] = lpn
+        self.valid[b] += 1
+        self.stamp[b] = self.clock
+
+    def _victim(self):
+        ppb = self.pages_per_block
+        if self.gc == "greedy":
+            for count in range(ppb + 1):
+                if self.sealed[count]:
+                    return next(iter(self.sealed[count]))
+            raise RuntimeError("no sealed block to collect")
+        best, best_score, seen = None, -1.0, 0
+        for count in range(ppb + 1):
+            for b in self.sealed[count]:
+                if count == 0:
+                    return b
+                u = count / ppb
+                score = (self.clock - self.stamp[b]) * (1 - u) / (2 * u)
+                if score > best_score:
+                    best, best_score = b, score
+                seen += 1
+                if seen >= self.window:
+                    return best
+        if best is None:
+            raise RuntimeError("no sealed block to collect")
+        return best
+
+    def _collect(self, b):
+        # move b's valid pages to the GC frontier, then erase it
+        if self.valid[b] == self.pages_per_block:
+            raise RuntimeError("flash full: every sealed block is fully valid")
+        self.sealed[self.valid[b]].discard(b)
+        copied = self._relocate(b)
+        self._erase(b)
+        self.gc_copied.append(copied)
+        cost = copied * (self.read_us + self.program_us) + self.erase_us
+        if self.total_erases % self.wl_interval == 0:
+            cost += self._level_wear()
+        return cost
+
+    def _relocate(self, b):
+        ppb = self.pages_per_block
+        copied = 0
+        for ppn in range(b * ppb, (b + 1) * ppb):
+            lpn = self.p2l[ppn]
+            if lpn >= 0:
+                self.p2l[ppn] = -1
+                self._program("gc", lpn)
+                copied += 1
+        self.valid[b] = 0
+        self.gc_writes += copied
+        return copied
+
+    def _erase(self, b):
+        self.erases[b] += 1
+        self.total_erases += 1
+        heapq.heappush(self.free, (self.erases[b], b))
+
+    def _level_wear(self):
+        # static wear leveling: recycle the least-erased block if it holds
+        # (presumably cold) data and the spread has grown too wide
+        low = min(self.erases)
+        if max(self.erases) - low <= self.wl_threshold:
+            return 0.0
+        b = self.erases.index(low)
+        if b not in self.sealed[self.valid[b]]:
+            return 0.0
+        self.sealed[self.valid[b]].discard(b)
+        copied = self._relocate(b)
+        self._erase(b)
+        self.gc_copied.append(copied)
+        return copied * (self.read_us + self.program_us) + self.erase_us
@@ -0,0 +1,183 @@
+# core/metrics.py
+import math
+from collections import Counter
+from itertools import chain
+from operator import itemgetter, mul, sub
+
+from core.cpu_logic import context_switches
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(ordered, p):
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not ordered:
+        return 0
+    return ordered[max(1, math.ceil(p * len(ordered) / 100)) - 1]
+
+
+def jain_index(values):
+    """Jain's fairness index: 1 when all values are equal, 1/n at worst."""
+    total = math.fsum(values)
+    squares = math.fsum(map(mul, values, values))
+    return total * total / (len(values) * squares) if squares else 1.0
+
+
+def _share(tat, wt):
+    # burst / turnaround; a zero-burst process that ran the instant it
+    # arrived has tat == 0 and waited for nothing, so its share is full
+    return (tat - wt) / tat if tat else 1.0
+
+
+def summarize(gantt, result):
+    """
+    Summary of a finished schedule.
+     - gantt : (pid, start, end) segments, or one such list per core (smp lanes)
+     - result: the per-process rows returned with it
+    Times are measured from 0, where every engine starts its clock. Waiting,
+    turnaround and response time get a mean and p50/p95/p99. Rows without
+    "rt" come from non-preemptive engines, where a process runs once, so rt = wt.
+    Fairness is Jain's index over each process's share burst / turnaround
+    (1 when the turnaround is 0).
+    Every pass is a sort, sum or map, so a 10^6 row run stays in C loops.
+    """
+    lanes = gantt if gantt and isinstance(gantt[0], list) else [gantt]
+    segments = list(chain.from_iterable(lanes))
+    ends = list(map(itemgetter(2), segments))
+    makespan = max(ends, default=0)
+    busy = math.fsum(map(sub, ends, map(itemgetter(1), segments)))
+    capacity = makespan * len(lanes)
+
+    n = len(result)
+    wt = list(map(itemgetter("wt"), result))
+    tat = list(map(itemgetter("tat"), result))
+    rt = list(map(itemgetter("rt"), result)) if n and "rt" in result[0] else wt
+
+    summary = {
+        "processes": n,
+        "makespan": makespan,
+        "busy": busy,
+        "idle": capacity - busy,
+        "utilization": busy / capacity if capacity else 0,
+        "throughput": n / makespan if makespan else 0,
+        "context_switches": sum(map(context_switches, lanes)),
+        "fairness": jain_index(list(map(_share, tat, wt))),
+    }
+    for name, column in (("wt", wt), ("tat", tat), ("rt", rt)):
+        ordered = sorted(column)
+        summary[f"{name}_mean"] = math.fsum(ordered) / n if n else 0
+        for p in PERCENTILES:
+            summary[f"{name}_p{p}"] = percentile(ordered, p)
+    return summary
+
+
+class StreamSummary:
+    """
+    Constant-memory counterpart of summarize() for an engine's event stream,
+    e.g. logic.round_robin(4, stream=True) or logic.smp(..., stream=True).
+    Feed it with update(events) or add(item); summary() has the same keys as
+    summarize(). Percentiles come from a histogram that is exact for whole
+    values below EXACT_LIMIT and within 1% above it, so memory grows with
+    the number of distinct buckets (logarithmic in the range), not with the
+    number of processes. `cores` counts lanes that may never run anything.
+    """
+
+    EXACT_LIMIT = 4096
+    RESIDUE = 1e-9
+    LOG_BASE = math.log(1.01)
+
+    def __init__(self, cores=1):
+        self.cores = cores
+        self.n = 0
+        self.makespan = 0
+        self.busy = 0
+        self.switches = 0
+        self.last = {}              # core -> pid of its latest segment
+        self.sums = {"wt": 0, "tat": 0, "rt": 0}
+        self.hist = {"wt": Counter(), "tat": Counter(), "rt": Counter()}
+        self.share = 0.0
+        self.share_sq = 0.0
+
+    def update(self, events):
+        add = self.add
+        for item in events:
+            add(item)
+        return self
+
+    def add(self, item):
+        if type(item) is tuple:
+            pid, start, end = item[:3]
+            core = item[3] if len(item) > 3 else 0
+            last = self.last.get(core)
+            if last is not None and last != pid:
+                self.switches += 1
+            self.last[core] = pid
+            if core >= self.cores:
+                self.cores = core + 1
+            if end > self.makespan:
+                self.makespan = end
+            self.busy += end - start
+            return
+        wt, tat = item["wt"], item["tat"]
+        self.n += 1
+        for name, value in (("wt", wt), ("tat", tat), ("rt", item.get("rt", wt))):
+            self.sums[name] += value
+            self.hist[name][self._bucket(value)] += 1
+        share = _share(tat, wt)
+        self.share += share
+        self.share_sq += share * share
+
+    def _bucket(self, value):
+        if value < self.RESIDUE:
+            # 0, or float rounding residue around it such as a wt of -4.4e-16
+            return 0
+        if value < self.EXACT_LIMIT and value == int(value):
+            return int(value)
+        # ("log", b) covers [1.01^b, 1.01^(b+1))
+        return "log", math.floor(math.log(value) / self.LOG_BASE)
+
+    def _percentiles(self, hist):
+        values = sorted((key if type(key) is int else math.exp((key[1] + 0.5) * self.LOG_BASE), count)
+                        for key, count in hist.items())
+        out = {}
+        for p in PERCENTILES:
+            rank = max(1, math.ceil(p * self.n / 100))
+            seen = 0
+            for value, count in values:
+                seen += count
+                if seen >= rank:
+                    out[p] = value
+                    break
+            else:
+                out[p] = 0
+        return out
+
+    def summary(self):
+        n = self.n
+        capacity = self.makespan * self.cores
+        summary = {
+            "processes": n,
+            "makespan": self.makespan,
+            "busy": self.busy,
+            "idle": capacity - self.busy,
+            "utilization": self.busy / capacity if capacity else 0,
+            "throughput": n / self.makespan if self.makespan else 0,
+            "context_switches": self.switches,
+            "fairness": self.share * self.share / (n * self.share_sq) if self.share_sq else 1.0,
+        }
+        for name in ("wt", "tat", "rt"):
+            summary[f"{name}_mean"] = self.sums[name] / n if n else 0
+            for p, value in self._percentiles(self.hist[name]).items():
+                summary[f"{name}_p{p}"] = value
+        return summary
+
+
+def format_summary(summary):
+    """One-line text for a status label."""
+    return (f"Avg WT {summary['wt_mean']:.2f} (p95 {summary['wt_p95']})   "
+            f"Avg TAT {summary['tat_mean']:.2f} (p95 {summary['tat_p95']})   "
+            f"Avg RT {summary['rt_mean']:.2f}   "
+            f"Throughput {summary['throughput']:.3f}/t   "
+            f"CPU {summary['utilization']:.0%}   Idle {summary['idle']:g}   "
+            f"Switches {summary['context_switches']}   "
+            f"Fairness {summary['fairness']:.3f}")
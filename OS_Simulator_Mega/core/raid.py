@@ -0,0 +1,199 @@
+# core/raid.py
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from core.disk_logic import (DiskGeometry, DiskMechanics, SWEEP_MODES, block_layer,
+                             mechanical, online)
+from core.metrics import percentile
+
+MECHANICAL = ("fcfs", "sptf", "satf")
+BLOCK_LAYER = ("noop", "deadline", "fair")
+ONLINE = ("sstf", *SWEEP_MODES)
+
+
+class RaidArray:
+    """
+    Array of identical disks (DiskMechanics `model`) behind one logical
+    address space, in stripe units of `stripe_sectors`.
+     - RAID 0 : units striped round robin over all disks
+     - RAID 1 : every disk holds everything; writes go to all of them,
+                reads to the least-loaded one
+     - RAID 5 : left-symmetric rotating parity; a write covering a whole
+                stripe row writes data and parity directly, any other write
+                reads old data and parity first (read-modify-write), with
+                one parity read and write per row spanning every part
+     - RAID 10: units striped over mirrored pairs (disks 2k, 2k + 1)
+    Read mirrors are picked by load: each disk's estimated busy-until time,
+    advanced by op_cost() per op assigned to it. Member disks are simulated
+    independently of one another, so the writes of a read-modify-write are
+    dated one op_cost() after the request, when its reads should be done.
+    """
+
+    LEVELS = (0, 1, 5, 10)
+    MIN_DISKS = {0: 1, 1: 2, 5: 3, 10: 4}
+
+    def __init__(self, level, disks, stripe_sectors=128, model=None):
+        if level not in self.LEVELS:
+            raise ValueError(f"unsupported RAID level: {level}")
+        if disks < self.MIN_DISKS[level] or (level == 10 and disks % 2):
+            raise ValueError(f"RAID {level} cannot use {disks} disks")
+        if stripe_sectors < 1:
+            raise ValueError("stripe_sectors must be positive")
+        self.level = level
+        self.disks = disks
+        self.stripe = stripe_sectors
+        self.model = model or DiskMechanics()
+        m = self.model
+        disk_sectors = m.cylinders * m.heads * m.sectors_per_track
+        rows = disk_sectors // stripe_sectors
+        self.capacity = {
+            0: rows * disks * stripe_sectors,
+            1: disk_sectors,
+            5: rows * (disks - 1) * stripe_sectors,
+            10: rows * (disks // 2) * stripe_sectors,
+        }[level]
+
+    def op_cost(self, sectors):
+        """Rough service estimate for one op: a third-stroke seek, half a
+        revolution and the transfer."""
+        m = self.model
+        return m.seek_time(m.cylinders // 3) + m.revolution / 2 + m.transfer_time(sectors)
+
+    def plan(self, lbas, sectors, arrivals, writes):
+        """Per-disk op columns (lbas, sectors, arrivals, writes, owners),
+        owners being the logical request behind each op."""
+        ops = [tuple(array(t) for t in "qqdbq") for _ in range(self.disks)]
+        busy = [0.0] * self.disks
+
+        def put(disk, lba, count, at, write, owner):
+            columns = ops[disk]
+            for column, value in zip(columns, (lba, count, at, write, owner)):
+                column.append(value)
+            busy[disk] = max(busy[disk], at) + self.op_cost(count)
+
+        stripe, n = self.stripe, self.disks
+        for q, (lba, count, at, write) in enumerate(zip(lbas, sectors, arrivals, writes)):
+            if lba < 0 or lba + count > self.capacity:
+                raise ValueError(f"request {q} lies outside the array's {self.capacity} sectors")
+            if self.level == 1:
+                if write:
+                    for disk in range(n):
+                        put(disk, lba, count, at, 1, q)
+                else:
+                    put(min(range(n), key=busy.__getitem__), lba, count, at, 0, q)
+                continue
+
+            pieces = []                     # (unit, offset, length)
+            while count:
+                unit, offset = divmod(lba, stripe)
+                length = min(count, stripe - offset)
+                pieces.append((unit, offset, length))
+                lba += length
+                count -= length
+
+            if self.level == 0:
+                for unit, offset, length in pieces:
+                    put(unit % n, unit // n * stripe + offset, length, at, write, q)
+            elif self.level == 10:
+                pairs = n // 2
+                for unit, offset, length in pieces:
+                    pair, member = unit % pairs * 2, unit // pairs * stripe + offset
+                    if write:
+                        put(pair, member, length, at, 1, q)
+                        put(pair + 1, member, length, at, 1, q)
+                    else:
+                        disk = pair if busy[pair] <= busy[pair + 1] else pair + 1
+                        put(disk, member, length, at, 0, q)
+            else:
+                self._raid5(pieces, at, write, q, put)
+        return ops
+
+    def _raid5(self, pieces, at, write, q, put):
+        stripe, n = self.stripe, self.disks
+        data = n - 1
+        rows = {}
+        for unit, offset, length in pieces:
+            rows.setdefault(unit // data, []).append((unit % data, offset, length))
+        for row, parts in rows.items():
+            parity = data - row % n
+            base = row * stripe
+            disk_of = [(parity + 1 + k) % n for k in range(data)]
+            if not write:
+                for k, offset, length in parts:
+                    put(disk_of[k], base + offset, length, at, 0, q)
+            elif sum(length for _, _, length in parts) == data * stripe:
+                for k, offset, length in parts:
+                    put(disk_of[k], base + offset, length, at, 1, q)
+                put(parity, base, stripe, at, 1, q)
+            else:
+                # one parity read-modify-write per row, over the sectors any
+                # part touches; it is the longest read, so it dates the writes
+                lo = min(offset for _, offset, _ in parts)
+                span = max(offset + length for _, offset, length in parts) - lo
+                for k, offset, length in parts:
+                    put(disk_of[k], base + offset, length, at, 0, q)
+                put(parity, base + lo, span, at, 0, q)
+                ready = at + self.op_cost(span)
+                for k, offset, length in parts:
+                    put(disk_of[k], base + offset, length, ready, 1, q)
+                put(parity, base + lo, span, ready, 1, q)
+
+    def run(self, lbas, sectors=None, arrivals=None, writes=None, algo="sptf", workers=None):
+        """
+        Map logical requests onto the members and simulate every member
+        disk with `algo` in its own worker process:
+         - fcfs / sptf / satf              : mechanical()
+         - noop / deadline / fair          : block_layer() (merging on)
+         - sstf / scan / c_scan / look / c_look: online() on the model's
+           cylinders; seek cost grows linearly with distance up to the
+           full-stroke time, plus half a revolution and the mean transfer
+           per op
+        A logical request completes when its last op does. Returns response
+        mean/p50/p99/max, makespan, throughput (requests/s), and each
+        member's op count and busy-until time.
+        """
+        if algo not in MECHANICAL + BLOCK_LAYER + ONLINE:
+            raise ValueError(f"unknown disk algorithm: {algo}")
+        n = len(lbas)
+        sectors = sectors if sectors is not None else [1] * n
+        arrivals = arrivals if arrivals is not None else [0.0] * n
+        writes = writes if writes is not None else [0] * n
+        ops = self.plan(lbas, sectors, arrivals, writes)
+
+        with ProcessPoolExecutor(max_workers=workers or min(self.disks, os.cpu_count() or 1)) as pool:
+            jobs = [pool.submit(_member_worker, self.model, algo, *columns[:4]) for columns in ops]
+            done = [job.result() for job in jobs]
+
+        completion = array("d", arrivals)
+        for (_, _, _, _, owners), finished in zip(ops, done):
+            for q, t in zip(owners, finished):
+                if t > completion[q]:
+                    completion[q] = t
+        response = sorted(t - a for t, a in zip(completion, arrivals))
+        makespan = max(completion, default=0)
+        return {
+            "response_mean": sum(response) / n if n else 0,
+            "response_p50": percentile(response, 50),
+            "response_p99": percentile(response, 99),
+            "response_max": response[-1] if n else 0,
+            "makespan": makespan,
+            "throughput": n / makespan * 1000 if makespan else 0,
+            "disk_ops": [len(columns[0]) for columns in ops],
+            "disk_busy": [max(finished, default=0) for finished in done],
+        }
+
+
+def _member_worker(model, algo, lbas, sectors, arrivals, writes):
+    # Runs in a pool process: simulate one member disk, return its op
+    # completion times in op order.
+    if algo in MECHANICAL:
+        return mechanical(model, lbas, sectors, arrivals, algo)["completion"]
+    if algo in BLOCK_LAYER:
+        return block_layer(lbas, sectors, arrivals, writes, scheduler=algo, model=model)["completion"]
+    cylinders = [model.locate(lba)[0] for lba in lbas]
+    per_cylinder = (model.full_stroke - model.track_to_track) / max(1, model.cylinders - 1)
+    mean_sectors = sum(sectors) / len(sectors) if len(sectors) else 0
+    return online(cylinders, arrivals, 0, algo, geometry=DiskGeometry(model.cylinders),
+                  seek_time=per_cylinder,
+                  service_time=model.revolution / 2 + model.transfer_time(mean_sectors))["completion"]
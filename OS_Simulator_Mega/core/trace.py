@@ -0,0 +1,98 @@
+# core/trace.py
+import mmap
+import os
+import struct
+from array import array
+
+from core.disk_logic import DiskGeometry
+
+
+class BlockTrace:
+    """
+    Block-I/O trace on disk, read through mmap one chunk at a time so a
+    trace of any size streams into the disk schedulers.
+     - "msr"   : SNIA / MSR-Cambridge CSV lines
+                 Timestamp,Hostname,DiskNumber,Type,Offset,Size,ResponseTime
+                 (timestamp in 100 ns ticks, offset and size in bytes)
+     - "binary": MAGIC, then fixed-width little-endian records of RECORD:
+                 time (us), LBA, sectors, write flag, 3 pad bytes
+    The format is detected from the MAGIC header unless given. Chunks are
+    (times_us, lbas, sectors, writes) arrays in file order.
+    """
+
+    FORMATS = ("msr", "binary")
+    MAGIC = b"BTR1"
+    RECORD = struct.Struct("<qqIB3x")
+
+    def __init__(self, path, fmt=None, geometry=None, sector_size=512):
+        if fmt is None:
+            with open(path, "rb") as f:
+                fmt = "binary" if f.read(len(self.MAGIC)) == self.MAGIC else "msr"
+        if fmt not in self.FORMATS:
+            raise ValueError(f"unknown trace format: {fmt}")
+        self.path = path
+        self.fmt = fmt
+        self.geometry = geometry or DiskGeometry()
+        self.sector_size = sector_size
+
+    def chunks(self, chunk_bytes=1 << 24):
+        if os.path.getsize(self.path) == 0:
+            return
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if self.fmt == "binary":
+                yield from self._binary(mm, chunk_bytes)
+            else:
+                yield from self._msr(mm, chunk_bytes)
+
+    def cylinders(self, chunk_bytes=1 << 24):
+        """Requested cylinders, one array('q') per chunk, for stream_seek()
+        or, concatenated, for the in-memory schedulers."""
+        for _, lbas, _, _ in self.chunks(chunk_bytes):
+            yield self.geometry.cylinders_of(lbas)
+
+    def _binary(self, mm, chunk_bytes):
+        size = self.RECORD.size
+        if mm[:len(self.MAGIC)] != self.MAGIC or (len(mm) - len(self.MAGIC)) % size:
+            raise ValueError(f"{self.path}: not a whole number of {size}-byte records")
+        step = max(1, chunk_bytes // size) * size
+        for pos in range(len(self.MAGIC), len(mm), step):
+            times, lbas, sectors, writes = zip(*self.RECORD.iter_unpack(mm[pos:pos + step]))
+            yield array("q", times), array("q", lbas), array("q", sectors), array("b", writes)
+
+    def _msr(self, mm, chunk_bytes):
+        sector = self.sector_size
+        pos, end = 0, len(mm)
+        while pos < end:
+            # cut at the last newline inside the chunk (or the next one after
+            # it, should a single line be longer than the chunk)
+            cut = mm.rfind(b"\n", pos, pos + chunk_bytes) if pos + chunk_bytes < end else end
+            if cut == -1:
+                cut = mm.find(b"\n", pos + chunk_bytes)
+                cut = end if cut == -1 else cut
+            rows = [line.split(b",") for line in mm[pos:cut].splitlines() if line.strip()]
+            pos = cut + 1
+            if rows and not rows[0][0].strip().isdigit():
+                rows.pop(0)         # header line
+            if not rows:
+                continue
+            try:
+                cols = list(zip(*rows))
+                times = array("q", (int(t) // 10 for t in cols[0]))
+                lbas = array("q", (int(o) // sector for o in cols[4]))
+                sectors = array("q", (-(-int(s) // sector) for s in cols[5]))
+            except (IndexError, ValueError):
+                raise ValueError(f"{self.path}: not an MSR-Cambridge CSV trace") from None
+            writes = array("b", (t.strip().lower() == b"write" for t in cols[3]))
+            yield times, lbas, sectors, writes
+
+    @classmethod
+    def write_binary(cls, path, chunks):
+        """Write (times_us, lbas, sectors, writes) chunks, e.g. another
+        trace's chunks(), in the binary format."""
+        pack = cls.RECORD.pack
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(cls.MAGIC)
+            for times, lbas, sectors, writes in chunks:
+                f.write(b"".join(map(pack, times, lbas, sectors, writes)))
+        os.replace(tmp, path)
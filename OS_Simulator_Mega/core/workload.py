@@ -0,0 +1,100 @@
+# core/workload.py
+import math
+import random
+from array import array
+from itertools import accumulate, chain, count, islice, repeat
+
+
+class Workload:
+    """
+    Seeded synthetic CPU workload.
+     - arrivals  : "poisson" (exponential gaps, `rate` per time unit) or
+                   "bursty" (batches of geometric size, mean `batch`, arriving
+                   as a Poisson process, so the mean rate is still `rate`)
+     - bursts    : "exponential" (mean `mean_burst`), "pareto" (shape `alpha`,
+                   scale `mean_burst` * (alpha - 1) / alpha, so the mean is
+                   `mean_burst` when alpha > 1) or "bimodal" (`short`/`long`
+                   exponential means, a `long_share` of long jobs)
+     - priorities: {priority: weight} mix, {0: 1} by default
+    Arrival times and bursts are whole time units (bursts at least 1), as
+    the GUI uses. Arrivals, bursts and priorities draw from separate seeded
+    generators, so stream() and any chunk size give the same workload.
+    """
+
+    ARRIVALS = ("poisson", "bursty")
+    BURSTS = ("exponential", "pareto", "bimodal")
+
+    def __init__(self, seed=None, arrivals="poisson", rate=0.2, batch=8,
+                 bursts="exponential", mean_burst=5, alpha=1.5,
+                 short=2, long=20, long_share=0.1, priorities=None):
+        if arrivals not in self.ARRIVALS:
+            raise ValueError(f"unknown arrival process: {arrivals}")
+        if bursts not in self.BURSTS:
+            raise ValueError(f"unknown burst distribution: {bursts}")
+        if rate <= 0 or mean_burst <= 0 or batch < 1:
+            raise ValueError("rate, mean_burst and batch must be positive")
+        if bursts == "pareto" and alpha <= 1:
+            raise ValueError("pareto bursts need alpha > 1 for a finite mean")
+        self.seed = seed
+        self.arrivals = arrivals
+        self.rate = rate
+        self.batch = batch
+        self.bursts = bursts
+        self.mean_burst = mean_burst
+        self.alpha = alpha
+        self.short = short
+        self.long = long
+        self.long_share = long_share
+        self.priorities = dict(priorities or {0: 1})
+
+    def chunks(self, n=None, size=65536):
+        """Yield (pids, arrivals, bursts, priorities) array chunks of up to
+        `size` processes, in arrival order; endless when n is None. Each chunk
+        can go straight into CPULogic.add_processes(arrivals, bursts,
+        priorities, pids)."""
+        seeds = random.Random(self.seed)
+        arrival_rng, burst_rng, prio_rng = (random.Random(seeds.getrandbits(64)) for _ in range(3))
+        clock = self._clock(arrival_rng)
+        levels = list(self.priorities)
+        cum = list(accumulate(self.priorities.values()))
+        pid = count(1)
+
+        left = math.inf if n is None else n
+        while left > 0:
+            k = int(min(size, left))
+            left -= k
+            pids = array("q", islice(pid, k))
+            arrivals = array("q", map(math.floor, islice(clock, k)))
+            bursts = array("q", self._bursts(burst_rng, k))
+            priorities = array("q", prio_rng.choices(levels, cum_weights=cum, k=k))
+            yield pids, arrivals, bursts, priorities
+
+    def stream(self, n=None, size=65536):
+        """Lazily yield (pid, arrival, burst, priority) one process at a time,
+        holding at most one chunk in memory."""
+        return chain.from_iterable(zip(*c) for c in self.chunks(n, size))
+
+    def _clock(self, rng):
+        # continuous arrival instants, floored to whole units by the caller
+        t = 0.0
+        if self.arrivals == "poisson":
+            while True:
+                t += rng.expovariate(self.rate)
+                yield t
+        p = 1 / self.batch
+        while True:
+            t += rng.expovariate(self.rate * p)
+            # geometric batch size >= 1 with mean `batch`
+            size = 1 if p == 1 else 1 + int(math.log(1 - rng.random()) / math.log(1 - p))
+            yield from repeat(t, size)
+
+    def _bursts(self, rng, k):
+        if self.bursts == "exponential":
+            draws = (rng.expovariate(1 / self.mean_burst) for _ in range(k))
+        elif self.bursts == "pareto":
+            scale = self.mean_burst * (self.alpha - 1) / self.alpha
+            draws = (scale * rng.paretovariate(self.alpha) for _ in range(k))
+        else:
+            means = (self.short, self.long)
+            draws = (rng.expovariate(1 / means[rng.random() < self.long_share]) for _ in range(k))
+        return map(max, repeat(1), map(math.ceil, draws))
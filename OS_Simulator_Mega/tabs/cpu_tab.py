@@ -1,13 +1,31 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from core.cpu_logic import CPULogic
+from core.metrics import summarize, format_summary
+from core.workload import Workload
+from core.cache import ScheduleCache
 from theme import theme_manager
 import time
 
+ALGO_METHODS = {
+    "FCFS": "fcfs",
+    "SJF": "sjf",
+    "SRTF": "srtf",
+    "Priority": "priority",
+    "Priority (Preemptive)": "priority_preemptive",
+    "Round Robin": "round_robin",
+    "MLFQ": "mlfq",
+    "CFS": "cfs",
+    "Lottery": "lottery",
+    "Stride": "stride",
+}
+
+QUANTUM_ALGOS = ("Round Robin", "MLFQ", "Lottery", "Stride")
 
 class CPUTab:
     def __init__(self, parent):
         self.logic = CPULogic()
+        self.logic.cache = ScheduleCache()
         self.pid_count = 1
 
         theme = theme_manager.get()
@@ -39,9 +57,9 @@ class CPUTab:
         self.algo_box = ttk.Combobox(
             top,
             textvariable=self.algo,
-            values=["FCFS", "SJF", "Priority", "Round Robin"],
+            values=["FCFS", "SJF", "SRTF", "Priority", "Priority (Preemptive)", "Round Robin", "MLFQ", "CFS", "Lottery", "Stride", "EDF", "Rate Monotonic"],
             state="readonly",
-            width=12
+            width=20
         )
         self.algo_box.pack(side="left", padx=6)
         self.algo_box.bind("<<ComboboxSelected>>", self.on_algo_change)
@@ -49,9 +67,41 @@ class CPUTab:
         self.q_label = tk.Label(top, text="Quantum", bg=theme["bg"], fg=theme["text"])
         self.q_entry = tk.Entry(top, width=5)
 
+        tk.Label(top, text="Cores", bg=theme["bg"], fg=theme["text"]).pack(side="left", padx=4)
+        self.cores = tk.Entry(top, width=4)
+        self.cores.insert(0, "1")
+        self.cores.pack(side="left", padx=4)
+
         tk.Button(top, text="Run", command=self.run).pack(side="left", padx=6)
+        tk.Button(top, text="Compare", command=self.compare).pack(side="left", padx=6)
         tk.Button(top, text="Reset", bg="#ff6b6b", command=self.reset).pack(side="left", padx=6)
 
+        # -------- PERIODIC TASKS (EDF / Rate Monotonic) --------
+        rt_bar = tk.Frame(self.frame, bg=theme["bg"])
+        rt_bar.pack(fill="x", padx=8)
+
+        tk.Label(rt_bar, text="Period", bg=theme["bg"], fg=theme["text"]).pack(side="left")
+        self.period = tk.Entry(rt_bar, width=5)
+        self.period.pack(side="left", padx=4)
+
+        tk.Label(rt_bar, text="WCET", bg=theme["bg"], fg=theme["text"]).pack(side="left")
+        self.wcet = tk.Entry(rt_bar, width=5)
+        self.wcet.pack(side="left", padx=4)
+
+        tk.Label(rt_bar, text="Deadline", bg=theme["bg"], fg=theme["text"]).pack(side="left")
+        self.deadline = tk.Entry(rt_bar, width=5)
+        self.deadline.pack(side="left", padx=4)
+
+        tk.Button(rt_bar, text="Add Task", command=self.add_task).pack(side="left", padx=6)
+        self.task_count = 1
+
+        # -------- SYNTHETIC WORKLOAD --------
+        self.bursts = tk.StringVar(value="exponential")
+        ttk.Combobox(rt_bar, textvariable=self.bursts, values=list(Workload.BURSTS),
+                     state="readonly", width=12).pack(side="left", padx=(24, 4))
+        tk.Button(rt_bar, text="Generate 10", command=self.generate).pack(side="left", padx=6)
+        self.gen_seed = 1
+
         # -------- TABLE --------
         self.table = ttk.Treeview(
             self.frame,
@@ -70,14 +120,17 @@ class CPUTab:
         # -------- RESULT --------
         self.result = ttk.Treeview(
             self.frame,
-            columns=("PID", "WT", "TAT"),
+            columns=("PID", "WT", "TAT", "RT"),
             show="headings",
             height=5
         )
-        for c in ("PID", "WT", "TAT"):
+        for c in ("PID", "WT", "TAT", "RT"):
             self.result.heading(c, text=c)
         self.result.pack(fill="x", padx=8, pady=6)
 
+        self.stats = tk.Label(self.frame, text="", bg=theme["bg"], fg=theme["text"], anchor="w")
+        self.stats.pack(fill="x", padx=8)
+
     # -------- ADD PROCESS --------
     def add_process(self):
         try:
@@ -102,9 +155,42 @@ class CPUTab:
         self.burst.delete(0, tk.END)
         self.priority.delete(0, tk.END)
 
+    # -------- GENERATE PROCESSES --------
+    def generate(self):
+        workload = Workload(seed=self.gen_seed, bursts=self.bursts.get(), priorities={0: 3, 1: 1, 2: 1})
+        self.gen_seed += 1
+        for _, a, b, p in workload.stream(10):
+            pid = f"P{self.pid_count}"
+            self.pid_count += 1
+            self.logic.add_process(pid, a, b, p)
+            self.processes[pid] = {"state": "New"}
+            self.table.insert("", "end", values=(pid, a, b, p))
+
+    # -------- ADD PERIODIC TASK --------
+    def add_task(self):
+        try:
+            period = float(self.period.get())
+            wcet = float(self.wcet.get())
+            deadline = float(self.deadline.get()) if self.deadline.get() else None
+            name = f"T{self.task_count}"
+            self.logic.add_task(name, int(period) if period.is_integer() else period,
+                                int(wcet) if wcet.is_integer() else wcet,
+                                deadline if deadline is None or not deadline.is_integer() else int(deadline))
+        except ValueError:
+            messagebox.showwarning("Invalid", "Enter positive period, WCET and deadline")
+            return
+
+        self.task_count += 1
+        task = self.logic.tasks[-1]
+        self.table.insert("", "end", values=(name, "periodic", task["wcet"],
+                                             f"T={task['period']} D={task['deadline']}"))
+
+        for e in (self.period, self.wcet, self.deadline):
+            e.delete(0, tk.END)
+
     # -------- ALGO CHANGE --------
     def on_algo_change(self, e=None):
-        if self.algo.get() == "Round Robin":
+        if self.algo.get() in QUANTUM_ALGOS:
             self.q_label.pack(side="left", padx=4)
             self.q_entry.pack(side="left", padx=4)
         else:
@@ -124,19 +210,53 @@ class CPUTab:
             if p["state"] == "New":
                 p["state"] = "Ready"
 
-        if algo == "FCFS":
-            gantt, res = self.logic.fcfs()
-        elif algo == "SJF":
-            gantt, res = self.logic.sjf()
-        elif algo == "Priority":
-            gantt, res = self.logic.priority()
-        else:
+        if algo in ("EDF", "Rate Monotonic"):
+            self.run_realtime(algo)
+            return
+
+        try:
+            cores = int(self.cores.get() or 1)
+        except:
+            messagebox.showwarning("Cores", "Enter number of cores")
+            return
+
+        if cores > 1:
+            if algo in ("Lottery", "Stride"):
+                messagebox.showwarning("Cores", f"{algo} runs on a single core")
+                return
+            params = {}
+            if algo in ("Round Robin", "MLFQ"):
+                try:
+                    params["quantum"] = int(self.q_entry.get())
+                except:
+                    messagebox.showwarning("Quantum", "Enter time quantum")
+                    return
+            lanes, res = self.logic.cached("smp", algo=ALGO_METHODS[algo], cores=cores, **params)
+            self.draw_lanes(lanes)
+            for lane in lanes:
+                for pid, _, _ in lane:
+                    self.processes[pid]["state"] = "Terminated"
+            for r in res:
+                self.result.insert("", "end", values=(r["pid"], r["wt"], r["tat"], r["rt"]))
+            self.stats.config(text=f"Cores: {cores}   " + format_summary(summarize(lanes, res)))
+            return
+
+        if algo in QUANTUM_ALGOS:
             try:
                 q = int(self.q_entry.get())
             except:
                 messagebox.showwarning("Quantum", "Enter time quantum")
                 return
-            gantt, res = self.logic.round_robin(q)
+            if algo == "MLFQ":
+                gantt, res = self.logic.cached("mlfq", quantum=q)
+            elif algo == "Lottery":
+                gantt, res = self.logic.cached("lottery", quantum=q, seed=0)
+            elif algo == "Stride":
+                gantt, res = self.logic.cached("stride", quantum=q)
+            else:
+                gantt, res = self.logic.cached("round_robin", quantum=q, merge=True)
+        else:
+            gantt, res = self.logic.cached(ALGO_METHODS[algo])
 
         self.animate_gantt(gantt)
 
@@ -145,7 +265,9 @@ class CPUTab:
             self.processes[pid]["state"] = "Terminated"
 
         for r in res:
-            self.result.insert("", "end", values=(r["pid"], r["wt"], r["tat"]))
+            self.result.insert("", "end", values=(r["pid"], r["wt"], r["tat"], r.get("rt", "-")))
+
+        self.stats.config(text=format_summary(summarize(gantt, res)))
 
     # -------- GANTT ANIMATION --------
     def animate_gantt(self, gantt):
@@ -181,12 +303,87 @@ class CPUTab:
 
         self.canvas.create_text(x, y + h + 18, text=str(gantt[-1][2]), fill=theme["text"], anchor="w")
 
+    # -------- REAL-TIME RUN --------
+    def run_realtime(self, algo):
+        if not self.logic.tasks:
+            messagebox.showwarning("Tasks", "Add periodic tasks first")
+            return
+        if algo == "EDF":
+            gantt, res = self.logic.cached("edf")
+            verdict = self.logic.cached("schedulability", policy="edf")
+        else:
+            gantt, res = self.logic.cached("rate_monotonic")
+            verdict = self.logic.cached("schedulability", policy="rm")
+
+        self.draw_lanes([gantt])
+        # columns reused as: task, deadline misses, worst response, jitter
+        for r in res:
+            self.result.insert("", "end", values=(r["task"], f"misses {r['misses']}",
+                                                  r["max_rt"], f"jitter {r['jitter']}"))
+        ok = "schedulable" if verdict["schedulable"] else "NOT schedulable"
+        self.stats.config(text=f"U = {verdict['utilization']:.3f} (bound {verdict['bound']:.3f}), "
+                               f"{verdict['test']} test: {ok}")
+
+    # -------- COMPARE ALL ALGORITHMS --------
+    def compare(self):
+        if not len(self.logic.processes):
+            messagebox.showwarning("Compare", "Add processes first")
+            return
+        try:
+            q = int(self.q_entry.get() or 2)
+        except:
+            messagebox.showwarning("Quantum", "Enter time quantum")
+            return
+        rows = self.logic.compare(quantum=q)
+
+        names = {method: name for name, method in ALGO_METHODS.items()}
+        cols = ("Algorithm", "Avg WT", "p95 WT", "Avg TAT", "Avg RT", "Throughput", "CPU", "Switches", "Fairness")
+        win = tk.Toplevel(self.frame)
+        win.title(f"Comparison (quantum {q})")
+        view = ttk.Treeview(win, columns=cols, show="headings", height=len(rows))
+        for c in cols:
+            view.heading(c, text=c)
+            view.column(c, width=90, anchor="center")
+        for r in rows:
+            view.insert("", "end", values=(
+                names[r["algorithm"]], f"{r['wt_mean']:.2f}", r["wt_p95"], f"{r['tat_mean']:.2f}",
+                f"{r['rt_mean']:.2f}", f"{r['throughput']:.3f}", f"{r['utilization']:.0%}",
+                r["context_switches"], f"{r['fairness']:.3f}"))
+        view.pack(fill="both", expand=True, padx=8, pady=8)
+
+    # -------- MULTI-CORE LANES --------
+    def draw_lanes(self, lanes):
+        theme = theme_manager.get()
+        end = max((lane[-1][2] for lane in lanes if lane), default=0)
+        if not end:
+            return
+        width = max(self.canvas.winfo_width(), 600) - 60
+        scale = width / end
+        h = min(40, 180 // len(lanes))
+
+        for c, lane in enumerate(lanes):
+            y = 10 + c * h
+            self.canvas.create_text(4, y + h / 2, text=f"C{c}", fill=theme["text"], anchor="w")
+            for pid, s, e in lane:
+                x1, x2 = 30 + s * scale, 30 + e * scale
+                self.canvas.create_rectangle(x1, y, x2, y + h - 2,
+                                             fill=theme["node_process"], outline=theme["text"])
+                if x2 - x1 > 20:
+                    self.canvas.create_text((x1 + x2) / 2, y + h / 2, text=pid, fill=theme["text"])
+
+        y = 10 + len(lanes) * h + 10
+        self.canvas.create_text(30, y, text="0", fill=theme["text"], anchor="w")
+        self.canvas.create_text(30 + width, y, text=str(end), fill=theme["text"], anchor="e")
+
     # -------- RESET --------
     def reset(self):
         self.logic.processes.clear()
+        self.logic.tasks.clear()
+        self.task_count = 1
         self.processes.clear()
         self.pid_count = 1
         self.canvas.delete("all")
+        self.stats.config(text="")
 
         for t in (self.table, self.result):
             for i in t.get_children():
@@ -1,12 +1,18 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-from core.disk_logic import fcfs, sstf, scan
+from tkinter import ttk, messagebox, filedialog, simpledialog
+from core.disk_logic import DiskGeometry, fcfs, sstf, scan, c_scan, look, c_look, stream_seek
+from core.trace import BlockTrace
 from theme import theme_manager
 import math
+import os
+
+SWEEPS = {"SCAN": scan, "C-SCAN": c_scan, "LOOK": look, "C-LOOK": c_look}
 
 
 class DiskTab:
     def __init__(self, notebook):
+        self.geometry = DiskGeometry()
+
         self.outer = tk.Frame(notebook)
         self.outer.pack(fill="both", expand=True)
 
@@ -51,7 +57,7 @@ class DiskTab:
         self.head_entry.grid(row=1, column=1, sticky="w", padx=8)
 
         ttk.Label(form, text="Algorithm").grid(row=2, column=0, sticky="w")
-        self.algo = ttk.Combobox(form, values=["FCFS", "SSTF", "SCAN"], state="readonly", width=12)
+        self.algo = ttk.Combobox(form, values=["FCFS", "SSTF", "SCAN", "C-SCAN", "LOOK", "C-LOOK"], state="readonly", width=12)
         self.algo.current(0)
         self.algo.grid(row=2, column=1, sticky="w", padx=8)
 
@@ -60,7 +66,18 @@ class DiskTab:
         self.direction.current(1)
         self.direction.grid(row=3, column=1, sticky="w", padx=8)
 
-        ttk.Button(self.frame, text="Simulate", command=self.simulate).pack(pady=6)
+        ttk.Label(form, text="Cylinders").grid(row=4, column=0, sticky="w")
+        self.cyl_entry = ttk.Entry(form, width=15)
+        self.cyl_entry.insert(0, str(self.geometry.cylinders))
+        self.cyl_entry.grid(row=4, column=1, sticky="w", padx=8)
+
+        buttons = ttk.Frame(self.frame)
+        buttons.pack(pady=6)
+        ttk.Button(buttons, text="Simulate", command=self.simulate).pack(side="left", padx=4)
+        ttk.Button(buttons, text="Load Trace", command=self.load_trace).pack(side="left", padx=4)
+
+        self.trace_label = tk.Label(self.frame, text="", font=("Segoe UI", 10))
+        self.trace_label.pack()
 
         self.seq_box = tk.Listbox(self.frame, height=6, width=40)
         self.seq_box.pack(pady=5)
@@ -92,6 +109,7 @@ class DiskTab:
         self.visual_frame.configure(bg=bg)
         self.title.configure(bg=bg, fg=accent)
         self.seq_box.configure(bg=bg, fg=fg)
+        self.trace_label.configure(bg=bg, fg=fg)
         self.canvas_v.configure(bg=bg)
         self.canvas_c.configure(bg=bg)
         self.graph2d.configure(bg=bg)
@@ -100,11 +118,11 @@ class DiskTab:
         self.canvas_v.delete("all")
         self.canvas_v.create_rectangle(50, 20, 70, 280, width=3)
         for r in requests:
-            y = 20 + (r / 199) * 260
+            y = 20 + self.geometry.fraction(r) * 260
             self.canvas_v.create_line(45, y, 75, y, fill="blue")
 
     def draw_vertical_head(self, pos):
-        y = 20 + (pos / 199) * 260
+        y = 20 + self.geometry.fraction(pos) * 260
         self.canvas_v.delete("head")
         self.canvas_v.create_rectangle(42, y-5, 78, y+5, fill="red", tags="head")
 
@@ -113,7 +131,7 @@ class DiskTab:
         self.canvas_c.create_oval(40, 40, 260, 260, width=3)
 
     def draw_circular_head(self, pos):
-        angle = (pos / 199) * 2 * math.pi
+        angle = self.geometry.fraction(pos) * 2 * math.pi
         cx, cy = 150, 150
         r = 100
         x = cx + r * math.cos(angle)
@@ -137,8 +155,10 @@ class DiskTab:
         self.graph2d.create_line(gx, gy, gx, gy + gh, width=2)
         self.graph2d.create_line(gx, gy + gh, gx + gw, gy + gh, width=2)
 
-        for t in range(0, 201, 20):
-            x = gx + (t / 199) * gw
+        last = self.geometry.last
+        step = max(1, math.ceil(last / 10))
+        for t in range(0, last + step, step):
+            x = gx + self.geometry.fraction(t) * gw
             self.graph2d.create_line(x, gy + gh - 5, x, gy + gh + 5)
             self.graph2d.create_text(x, gy + gh + 18, text=str(t), font=("Segoe UI", 8))
 
@@ -146,7 +166,7 @@ class DiskTab:
         step_y = gh / (len(seq) - 1)
 
         for i, pos in enumerate(seq):
-            x = gx + (pos / 199) * gw
+            x = gx + self.geometry.fraction(pos) * gw
             y = gy + i * step_y
             self.points.append((x, y))
 
@@ -177,10 +197,18 @@ class DiskTab:
         try:
             requests = list(map(int, self.req_entry.get().replace(" ", "").split(",")))
             head = int(self.head_entry.get())
+            cylinders = int(self.cyl_entry.get())
         except:
             messagebox.showerror("Error", "Invalid Input")
             return
 
+        try:
+            self.geometry = DiskGeometry(cylinders)
+            self.geometry.check(requests, head)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+
         algo = self.algo.get()
         direction = self.direction.get()
 
@@ -189,7 +217,7 @@ class DiskTab:
         elif algo == "SSTF":
             seq, _ = sstf(requests, head)
         else:
-            seq, _ = scan(requests, head, direction)
+            seq, _ = SWEEPS[algo](requests, head, direction, geometry=self.geometry)
 
         self.seq_box.delete(0, tk.END)
         for s in seq:
@@ -199,3 +227,43 @@ class DiskTab:
         self.draw_circular_disk()
         self.animate_heads(seq)
         self.draw_2d_graph(seq)
+
+    # -------- BLOCK TRACE (streamed, seek total only) --------
+    def load_trace(self):
+        path = filedialog.askopenfilename(
+            title="Block trace",
+            filetypes=[("Block traces", "*.csv *.btr"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            head = int(self.head_entry.get() or 0)
+            cylinders = int(self.cyl_entry.get())
+        except:
+            messagebox.showerror("Error", "Invalid Input")
+            return
+        spc = simpledialog.askinteger("Block trace", "Sectors per cylinder",
+                                      initialvalue=1, minvalue=1, parent=self.frame)
+        if spc is None:
+            return
+
+        count = 0
+
+        def counted(chunks):
+            nonlocal count
+            for chunk in chunks:
+                count += len(chunk)
+                yield chunk
+
+        algo = self.algo.get().lower().replace("-", "_")
+        try:
+            geometry = DiskGeometry(cylinders, spc)
+            geometry.check((), head)
+            trace = BlockTrace(path, geometry=geometry)
+            seek = stream_seek(counted(trace.cylinders()), head, algo, self.direction.get(), geometry)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.geometry = geometry
+        self.trace_label.config(
+            text=f"{os.path.basename(path)} ({trace.fmt}): {count} requests, "
+                 f"{self.algo.get()} total seek {seek}")